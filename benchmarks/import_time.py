@@ -0,0 +1,82 @@
+"""Measures the import time of q_sdk in fresh interpreters
+
+Usage: python benchmarks/import_time.py [--runs 20] [--max-ms 50]
+
+Exits with 1 if the median import time of any statement exceeds --max-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = [
+    "import q_sdk",
+    "from q_sdk import QApi",
+    "from q_sdk import QApi; QApi(uri='http://localhost')",
+]
+
+_TIMER = """
+import time
+start = time.perf_counter()
+{statement}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def _env() -> dict:
+    """Environment of the interpreters, with the repository on the path so it works from any directory"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+
+
+def measure(statement: str, runs: int) -> list[float]:
+    """Runs the statement in runs new interpreters and returns the times in milliseconds"""
+    env = _env()
+    times = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(statement=statement)],
+            env=env, check=True, capture_output=True, text=True
+        )
+        times.append(float(out.stdout.strip()))
+    return times
+
+
+def slowest_modules(statement: str, count: int = 10) -> list[tuple[int, str]]:
+    """Returns the modules with the highest cumulative import time, as reported by -X importtime"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], env=_env(), check=True, capture_output=True, text=True
+    )
+    modules = []
+    # Lines look like "import time:       197 |        197 |   _io"
+    for line in out.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative), name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="Number of interpreters per statement")
+    parser.add_argument("--max-ms", type=float, help="Maximum median import time in milliseconds")
+    parser.add_argument("--profile", action="store_true", help="Show the slowest modules of each statement")
+    args = parser.parse_args()
+
+    failed = False
+    for statement in STATEMENTS:
+        times = measure(statement, args.runs)
+        median = statistics.median(times)
+        print(f"{median:8.2f} ms (min {min(times):.2f} ms)  {statement}")
+        if args.profile:
+            for cumulative, name in slowest_modules(statement):
+                print(f"{cumulative / 1000:16.2f} ms  {name}")
+        if args.max_ms is not None and median > args.max_ms:
+            failed = True
+    if failed:
+        print(f"Import time exceeds {args.max_ms} ms", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,52 @@
-from .main import QApi
+"""Reference implementation of the API of Q
+
+Submodules are imported on first access of their names, so importing q_sdk is cheap.
+"""
+
+_EXPORTS = {
+    "QApi": ".main",
+    "Method": ".main",
+    "ObjectType": ".main",
+    "HttpStatusCodeException": ".error",
+    "ValidationError": ".error",
+    "Balancing": ".endpoints",
+    "EndpointPool": ".endpoints",
+    "Compression": ".compression",
+    "ColumnFormat": ".columnar",
+    "SessionStore": ".session",
+    "FileSessionStore": ".session",
+    "Check": ".objects.check",
+    "CheckParam": ".objects.check",
+    "Contact": ".objects.contact",
+    "ContactParam": ".objects.contact",
+    "ContactGroup": ".objects.contact_group",
+    "ContactGroupParam": ".objects.contact_group",
+    "GlobalVariable": ".objects.global_variable",
+    "GlobalVariableParam": ".objects.global_variable",
+    "Host": ".objects.host",
+    "HostParam": ".objects.host",
+    "HostTemplate": ".objects.host_template",
+    "HostTemplateParam": ".objects.host_template",
+    "Metric": ".objects.metric",
+    "MetricTemplate": ".objects.metric_template",
+    "MetricTemplateParam": ".objects.metric_template",
+    "Proxy": ".objects.proxy",
+    "ProxyParam": ".objects.proxy",
+    "TimePeriod": ".objects.time_period",
+    "TimePeriodParam": ".objects.time_period",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
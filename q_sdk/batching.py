@@ -0,0 +1,82 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Union
+
+from .error import HttpStatusCodeException
+
+logger = logging.getLogger("QApi")
+
+
+class BatchLoader:
+    """Collects lookups of single objects and fetches them with one filtered listing
+
+    IDs requested within window seconds after the first one are sent as one request with a filter of all IDs.
+    The batch is sent earlier if max_batch IDs are pending. Each caller gets a Future of its own object, so
+    concurrent point lookups from many threads become a few listings. Multiple lookups of the same ID in one
+    batch share the result. Results are not cached across batches.
+
+    :param fetch: Callable that gets a list of IDs and returns the objects as list of dicts
+    :param window: Optional. Time in seconds lookups are collected. Defaults to 0.005
+    :param max_batch: Optional. Maximum number of IDs per request. Defaults to 100
+    """
+    def __init__(self, fetch: Callable[[list[str]], list[dict]], window: float = 0.005, max_batch: int = 100):
+        self.fetch = fetch
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def load(self, object_id: Union[str, int]) -> Future:
+        """Request an object
+
+        :param object_id: ID of the object
+
+        :return: Future that resolves to the object as dict
+        """
+        object_id = str(object_id)
+        with self._lock:
+            future = self._pending.get(object_id)
+            if future is not None:
+                return future
+            future = self._pending[object_id] = Future()
+            batch = None
+            if len(self._pending) >= self.max_batch:
+                batch = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.dispatch)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._send(batch)
+        return future
+
+    def _take(self) -> dict:
+        pending, self._pending = self._pending, {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return pending
+
+    def dispatch(self) -> None:
+        """Send all pending lookups now"""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch: dict) -> None:
+        try:
+            records = self.fetch(list(batch))
+        except Exception as err:
+            logger.error(f"Batched lookup of {len(batch)} objects failed: {err}")
+            for future in batch.values():
+                future.set_exception(err)
+            return
+        by_id = {str(x["id"]): x for x in records}
+        for object_id, future in batch.items():
+            if object_id in by_id:
+                future.set_result(by_id[object_id])
+            else:
+                future.set_exception(HttpStatusCodeException(404, f"Object {object_id} not found"))
@@ -0,0 +1,166 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Union
+
+from .main import Method, ObjectType, QApi, REFERENCES
+
+logger = logging.getLogger("QApi")
+
+CREATE_EXCLUDED_FIELDS = {
+    ObjectType.PROXY: {"secret", "web_secret"},
+}
+"""Fields that are returned by the API, but are generated by the server and can't be set on creation"""
+
+
+def ref_ids(value) -> list[str]:
+    """Returns the IDs of a reference field. References may be an ID, a nested object or a list of them."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [x for v in value for x in ref_ids(v)]
+    if isinstance(value, dict):
+        return [str(value["id"])] if "id" in value else []
+    return [str(value)]
+
+
+def fetch_objects(
+        api: QApi, object_type: ObjectType, ids: Iterable[Union[str, int]], chunk_size: int = 100
+) -> Iterator[dict]:
+    """Retrieves objects by their IDs
+
+    IDs are sent as filter in the query string, so they are split into listings of chunk_size IDs to keep the URLs
+    within the limits of servers and proxies.
+
+    :param api: QApi to read the objects with
+    :param object_type: Type of the objects
+    :param ids: IDs of the objects. Missing objects are skipped.
+    :param chunk_size: Optional. Number of IDs per request. Defaults to 100
+    """
+    ids = [str(x) for x in ids]
+    for i in range(0, len(ids), chunk_size):
+        yield from api._make_request(Method.GET, object_type.value, {"filter": ids[i:i + chunk_size]})["data"]
+
+
+def load_objects(api: QApi, object_types: Iterable[ObjectType]) -> dict[tuple[ObjectType, str], dict]:
+    """Loads all objects of the given types, keyed by their type and ID"""
+    return {
+        (object_type, str(record["id"])): record
+        for object_type in object_types
+        for record in api._make_stream_request(object_type.value)
+    }
+
+
+def dependency_levels(objects: dict[tuple[ObjectType, str], dict]) -> list[list[tuple[ObjectType, str]]]:
+    """Sorts objects topologically by the objects they reference
+
+    References to objects that are not part of objects are ignored.
+
+    :param objects: Objects keyed by type and ID, see load_objects
+
+    :return: List of levels. Objects of a level only reference objects of earlier levels.
+    """
+    dependencies = {}
+    for key, record in objects.items():
+        object_type = key[0]
+        dependencies[key] = {
+            (ref_type, ref_id)
+            for field, ref_type in REFERENCES[object_type].items()
+            for ref_id in ref_ids(record.get(field))
+            if (ref_type, ref_id) in objects and (ref_type, ref_id) != key
+        }
+    levels = []
+    while dependencies:
+        level = [key for key, deps in dependencies.items() if not deps]
+        if not level:
+            cyclic = ", ".join(f"{object_type.value}/{object_id}" for object_type, object_id in dependencies)
+            raise ValueError(f"Found cyclic references between {cyclic}")
+        levels.append(level)
+        for key in level:
+            del dependencies[key]
+        done = set(level)
+        for deps in dependencies.values():
+            deps -= done
+    return levels
+
+
+def _run_levels(levels: list[list], func: Callable, max_workers: int) -> None:
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for level in levels:
+            futures = [executor.submit(func, key) for key in level]
+            for future in futures:
+                future.result()
+
+
+def _remap(value, ref_type: ObjectType, id_map: dict):
+    if isinstance(value, list):
+        return [_remap(x, ref_type, id_map) for x in value]
+    if isinstance(value, dict):
+        value = value.get("id")
+    if value is None or value == "":
+        return value
+    if (ref_type, str(value)) not in id_map:
+        logger.warning(f"Reference to {ref_type.value}/{value} is not part of the cloned objects, keeping it")
+        return value
+    return id_map[(ref_type, str(value))]
+
+
+def clone(
+        source: QApi, target: QApi = None, object_types: Iterable[ObjectType] = None,
+        rename: Callable[[ObjectType, dict], dict] = None, max_workers: int = 8
+) -> dict[tuple[ObjectType, str], str]:
+    """Copies all objects of the given types from source to target
+
+    Objects are created in the order of their references, all objects of a dependency level concurrently.
+    References to cloned objects are remapped to the IDs of the copies.
+
+    :param source: QApi to read the objects from
+    :param target: Optional. QApi to create the copies with. Defaults to source.
+    :param object_types: Optional. Types of the objects to clone. Defaults to all types.
+    :param rename: Optional. Callable that gets the type and the payload of each copy and returns the payload to create.
+    Use it to change the names when cloning into the same instance.
+    :param max_workers: Optional. Number of concurrent requests. Defaults to 8
+
+    :return: Dict mapping the type and ID of each source object to the ID of its copy
+    """
+    target = target or source
+    objects = load_objects(source, object_types or list(ObjectType))
+    id_map = {}
+
+    def create(key):
+        object_type, object_id = key
+        excluded = CREATE_EXCLUDED_FIELDS.get(object_type, set())
+        references = REFERENCES[object_type]
+        payload = {}
+        for field, value in objects[key].items():
+            if field == "id" or field in excluded or value is None:
+                continue
+            payload[field] = _remap(value, references[field], id_map) if field in references else value
+        if rename:
+            payload = rename(object_type, payload)
+        ret = target._make_request(Method.POST, object_type.value, data=payload)
+        id_map[key] = str(ret["data"])
+        logger.debug(f"Cloned {object_type.value}/{object_id} to {object_type.value}/{id_map[key]}")
+
+    _run_levels(dependency_levels(objects), create, max_workers)
+    return id_map
+
+
+def teardown(api: QApi, object_types: Iterable[ObjectType] = None, max_workers: int = 8) -> int:
+    """Deletes all objects of the given types
+
+    Objects are deleted before the objects they reference, all objects of a dependency level concurrently.
+
+    :param api: QApi to delete the objects with
+    :param object_types: Optional. Types of the objects to delete. Defaults to all types.
+    :param max_workers: Optional. Number of concurrent requests. Defaults to 8
+
+    :return: Number of deleted objects
+    """
+    objects = load_objects(api, object_types or list(ObjectType))
+
+    def delete(key):
+        object_type, object_id = key
+        api._make_request(Method.DELETE, f"{object_type.value}/{object_id}")
+
+    _run_levels(dependency_levels(objects)[::-1], delete, max_workers)
+    return len(objects)
@@ -0,0 +1,135 @@
+import enum
+import inspect
+import json
+import sys
+from typing import Iterable, Optional
+
+
+class ColumnFormat(enum.Enum):
+    AUTO = "auto"
+    """Use pyarrow if installed, else pandas, else numpy, else python lists"""
+    PYARROW = "pyarrow"
+    """pyarrow.Table, string columns are dictionary encoded"""
+    PANDAS = "pandas"
+    """pandas.DataFrame, string columns are categoricals, ints and bools with missing values are Int64 and boolean"""
+    NUMPY = "numpy"
+    """Dict of numpy arrays, strings are interned, numbers with missing values are float64 with NaN"""
+    PYTHON = "python"
+    """Dict of lists, strings are interned"""
+
+
+def default_fields(cls) -> list[str]:
+    """Returns the attributes of an object class, taken from the parameters of its constructor"""
+    return [x for x in inspect.signature(cls.__init__).parameters if x != "self"]
+
+
+def _is_installed(module: str) -> bool:
+    if module in sys.modules:
+        return True
+    try:
+        __import__(module)
+    except ImportError:
+        return False
+    return True
+
+
+def _resolve_format(fmt: ColumnFormat) -> ColumnFormat:
+    if fmt != ColumnFormat.AUTO:
+        return fmt
+    for candidate in (ColumnFormat.PYARROW, ColumnFormat.PANDAS, ColumnFormat.NUMPY):
+        if _is_installed(candidate.value):
+            return candidate
+    return ColumnFormat.PYTHON
+
+
+def collect_columns(records: Iterable[dict], fields: list[str]) -> dict[str, list]:
+    """Transposes records into one list per field
+
+    Strings are interned, so repeated values like proxy IDs or check names share a single object.
+    Missing fields are filled with None.
+    """
+    columns = {x: [] for x in fields}
+    intern = sys.intern
+    for record in records:
+        for field, column in columns.items():
+            value = record.get(field)
+            if isinstance(value, dict) and "id" in value and field != "variables":
+                # References may be returned as nested objects, only keep their ID
+                value = value["id"]
+            column.append(intern(value) if type(value) is str else value)
+    return columns
+
+
+def _numeric_types(values: list) -> Optional[set]:
+    """Returns the types of a column of bools or numbers, ignoring missing values, or None for other columns
+
+    The object classes default unset numbers to None or "", e.g. Metric.scheduling_interval, so both are missing values.
+    """
+    types = {type(x) for x in values if x is not None and x != ""}
+    if types and (types == {bool} or types <= {int, float}):
+        return types
+    return None
+
+
+def _numpy_column(np, values: list):
+    types = _numeric_types(values)
+    if types is not None:
+        missing = [x is None or x == "" for x in values]
+        if not any(missing):
+            if types == {bool}:
+                return np.array(values, dtype=bool)
+            return np.array(values, dtype=np.int64 if types == {int} else np.float64)
+        # numpy has no missing values for ints and bools, so they are stored as float with NaN
+        return np.array([np.nan if m else float(x) for x, m in zip(values, missing)], dtype=np.float64)
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _pandas_column(pd, np, values: list):
+    types = _numeric_types(values)
+    if types is not None and any(x is None or x == "" for x in values):
+        values = [None if x == "" else x for x in values]
+        if types == {bool}:
+            return pd.array(values, dtype="boolean")
+        if types == {int}:
+            return pd.array(values, dtype="Int64")
+        return np.array([np.nan if x is None else x for x in values], dtype=np.float64)
+    if {type(x) for x in values if x is not None} == {str}:
+        return pd.Categorical(values)
+    return _numpy_column(np, values)
+
+
+def _arrow_column(pa, values: list):
+    if _numeric_types(values) is not None:
+        values = [None if x == "" else x for x in values]
+    types = {type(x) for x in values if x is not None}
+    if types == {str}:
+        return pa.array(values, type=pa.string()).dictionary_encode()
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        # Mixed types, store them as JSON encoded strings
+        return pa.array([None if x is None else json.dumps(x) for x in values], type=pa.string()).dictionary_encode()
+
+
+def to_columnar(columns: dict[str, list], fmt: ColumnFormat = ColumnFormat.AUTO):
+    """Converts a dict of lists into the requested columnar format
+
+    :param columns: Dict of field name to list of values, see collect_columns
+    :param fmt: Format of the result. See ColumnFormat.
+
+    :return: pyarrow.Table, pandas.DataFrame, dict of numpy arrays or dict of lists
+    """
+    fmt = _resolve_format(fmt)
+    if fmt == ColumnFormat.PYTHON:
+        return columns
+    if fmt == ColumnFormat.NUMPY:
+        import numpy as np
+        return {name: _numpy_column(np, values) for name, values in columns.items()}
+    if fmt == ColumnFormat.PANDAS:
+        import numpy as np
+        import pandas as pd
+        return pd.DataFrame({name: _pandas_column(pd, np, values) for name, values in columns.items()})
+    import pyarrow as pa
+    return pa.table({name: _arrow_column(pa, values) for name, values in columns.items()})
@@ -0,0 +1,51 @@
+import enum
+
+from .objects.base import Base
+
+
+class Compression(enum.Enum):
+    GZIP = "gzip"
+    ZSTD = "zstd"
+    """Requires the zstandard package"""
+
+
+def compressor(compression: Compression):
+    """Returns a function compressing bytes with the given algorithm"""
+    if compression == Compression.GZIP:
+        import gzip
+        return lambda data: gzip.compress(data, compresslevel=6)
+    import zstandard
+    return zstandard.ZstdCompressor().compress
+
+
+class RequestStats(Base):
+    """Sizes of a request and its response, used to tune the compression threshold
+
+    :param method: HTTP method
+    :param endpoint: Endpoint of the request
+    :param request_bytes: Size of the request body before compression
+    :param request_sent_bytes: Size of the request body as sent
+    :param response_bytes: Size of the decoded response body
+    :param response_received_bytes: Size of the response body as received
+    """
+    def __init__(
+            self, method: str, endpoint: str, request_bytes: int = 0, request_sent_bytes: int = 0,
+            response_bytes: int = 0, response_received_bytes: int = 0
+    ):
+        super(RequestStats, self).__init__()
+        self.method = method
+        self.endpoint = endpoint
+        self.request_bytes = request_bytes
+        self.request_sent_bytes = request_sent_bytes
+        self.response_bytes = response_bytes
+        self.response_received_bytes = response_received_bytes
+
+    @property
+    def request_ratio(self) -> float:
+        """Compression ratio of the request, 1 if it wasn't compressed"""
+        return self.request_bytes / self.request_sent_bytes if self.request_sent_bytes else 1.0
+
+    @property
+    def response_ratio(self) -> float:
+        """Compression ratio of the response, 1 if it wasn't compressed"""
+        return self.response_bytes / self.response_received_bytes if self.response_received_bytes else 1.0
@@ -0,0 +1,94 @@
+import collections
+import enum
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger("QApi")
+
+
+class Balancing(enum.Enum):
+    ROUND_ROBIN = "round_robin"
+    """Reads are distributed evenly across all endpoints"""
+    LEAST_LATENCY = "least_latency"
+    """Reads are sent to the endpoint with the lowest average latency"""
+
+
+class _EndpointState:
+    def __init__(self, window: int):
+        self.results = collections.deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.latency = 0.0
+        self.disabled_until = 0.0
+
+
+class EndpointPool:
+    """Set of API endpoints of the same Q instance
+
+    The first endpoint is the primary, it receives all writes. Reads are distributed across all endpoints.
+    Endpoints are taken out of rotation for cooldown seconds after max_failures consecutive failures or if more
+    than max_error_rate of their last window requests failed. A failure is a transport error or a 5xx answer.
+
+    :param uris: URIs of the endpoints, the first one is the primary
+    :param balancing: Optional. Strategy to distribute reads. Defaults to Balancing.ROUND_ROBIN
+    :param max_failures: Optional. Consecutive failures until an endpoint is taken out of rotation. Defaults to 3
+    :param max_error_rate: Optional. Error rate until an endpoint is taken out of rotation. Defaults to 0.5
+    :param window: Optional. Number of requests the error rate is calculated over. Defaults to 20
+    :param cooldown: Optional. Seconds an endpoint stays out of rotation. Defaults to 30
+    """
+    def __init__(
+            self, uris: list[str], balancing: Balancing = Balancing.ROUND_ROBIN, max_failures: int = 3,
+            max_error_rate: float = 0.5, window: int = 20, cooldown: float = 30
+    ):
+        if not uris:
+            raise ValueError("At least one endpoint is required")
+        self.uris = list(uris)
+        self.balancing = balancing
+        self.max_failures = max_failures
+        self.max_error_rate = max_error_rate
+        self.window = window
+        self.cooldown = cooldown
+        self._states = {x: _EndpointState(window) for x in self.uris}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> str:
+        return self.uris[0]
+
+    def healthy(self) -> list[str]:
+        """Returns the endpoints that are in rotation. If none is, all endpoints are returned."""
+        now = time.monotonic()
+        healthy = [x for x in self.uris if self._states[x].disabled_until <= now]
+        return healthy or list(self.uris)
+
+    def read_order(self) -> list[str]:
+        """Returns the healthy endpoints in the order they should be tried for a read"""
+        healthy = self.healthy()
+        if self.balancing == Balancing.LEAST_LATENCY:
+            return sorted(healthy, key=lambda x: self._states[x].latency)
+        start = next(self._counter) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def record_success(self, uri: str, latency: float) -> None:
+        with self._lock:
+            state = self._states[uri]
+            state.results.append(True)
+            state.consecutive_failures = 0
+            # Exponentially weighted average, an endpoint without measurements has a latency of 0 and is tried first
+            state.latency = latency if not state.latency else 0.8 * state.latency + 0.2 * latency
+
+    def record_failure(self, uri: str) -> None:
+        with self._lock:
+            state = self._states[uri]
+            state.results.append(False)
+            state.consecutive_failures += 1
+            error_rate = state.results.count(False) / len(state.results)
+            if state.consecutive_failures >= self.max_failures or (
+                    len(state.results) == self.window and error_rate > self.max_error_rate
+            ):
+                logger.warning(f"Taking endpoint {uri} out of rotation for {self.cooldown}s")
+                state.disabled_until = time.monotonic() + self.cooldown
+                state.results.clear()
+                state.consecutive_failures = 0
@@ -4,3 +4,9 @@ class HttpStatusCodeException(Exception):
         self.status_code = status_code
         self.msg = msg
         super(HttpStatusCodeException, self).__init__(msg)
+
+
+class ValidationError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super(ValidationError, self).__init__("; ".join(errors))
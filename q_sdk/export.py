@@ -0,0 +1,124 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+from typing import Iterable
+
+from .columnar import default_fields
+from .main import OBJECT_CLASSES, ObjectType, QApi
+
+COMPRESSIONS = {
+    None: open,
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+"""Compressions supported for NDJSON exports"""
+
+PARQUET_BATCH_SIZE = 1024
+"""Number of rows written to a Parquet file at once"""
+
+EXTRA_COLUMN = "_extra"
+"""Parquet column holding the fields the object classes don't model, as JSON object"""
+
+
+def export_ndjson(
+        api: QApi, path: str, object_types: Iterable[ObjectType] = None, compression: str = None
+) -> dict[ObjectType, int]:
+    """Streams all objects of the given types into a NDJSON file
+
+    Each line is an object of the form {"type": "<endpoint of the type>", "object": {...}}.
+    Objects are written while the listing is received, so the inventory is never held in memory.
+
+    :param api: QApi to read the objects with
+    :param path: Path of the file
+    :param object_types: Optional. Types to export. Defaults to all types.
+    :param compression: Optional. One of gzip, bz2 or xz.
+
+    :return: Number of exported objects per type
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression {compression}")
+    counts = {}
+    with COMPRESSIONS[compression](path, "wt") as f:
+        for object_type in object_types or ObjectType:
+            counts[object_type] = 0
+            for record in api._make_stream_request(object_type.value):
+                f.write(json.dumps({"type": object_type.value, "object": record}, separators=(",", ":")))
+                f.write("\n")
+                counts[object_type] += 1
+    return counts
+
+
+def _parquet_value(value):
+    # Types of values differ between objects, e.g. an empty string or an int as scheduling_interval,
+    # so every column is a string column and everything but strings is stored as JSON
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"))
+
+
+def export_parquet(
+        api: QApi, directory: str, object_types: Iterable[ObjectType] = None, compression: str = "zstd"
+) -> dict[ObjectType, int]:
+    """Streams all objects of the given types into one Parquet file per type. Requires pyarrow.
+
+    The files are named after the endpoint of the type, e.g. hosts.parquet. Rows are written in batches of
+    PARQUET_BATCH_SIZE. All columns are string columns, values that aren't strings are stored as JSON.
+    Each file has an id column and a column per attribute of the object class. Fields of the answer that the class
+    doesn't model are stored as JSON object in EXTRA_COLUMN, so the files hold the same data as export_ndjson.
+
+    :param api: QApi to read the objects with
+    :param directory: Directory of the files. Created if it doesn't exist.
+    :param object_types: Optional. Types to export. Defaults to all types.
+    :param compression: Optional. Parquet compression codec, e.g. zstd, snappy, gzip or none. Defaults to zstd
+
+    :return: Number of exported objects per type
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for object_type in object_types or ObjectType:
+        fields = ["id"] + [x for x in default_fields(OBJECT_CLASSES[object_type]) if x != "id"]
+        known = set(fields)
+        schema = pa.schema([(x, pa.string()) for x in fields + [EXTRA_COLUMN]])
+        batch = []
+        counts[object_type] = 0
+        with pq.ParquetWriter(
+                os.path.join(directory, f"{object_type.value}.parquet"), schema, compression=compression
+        ) as writer:
+            for record in api._make_stream_request(object_type.value):
+                row = {x: _parquet_value(record.get(x)) for x in fields}
+                extra = {k: v for k, v in record.items() if k not in known}
+                row[EXTRA_COLUMN] = _parquet_value(extra) if extra else None
+                batch.append(row)
+                counts[object_type] += 1
+                if len(batch) >= PARQUET_BATCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    batch.clear()
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    return counts
+
+
+def export_inventory(
+        api: QApi, path: str, fmt: str = "ndjson", object_types: Iterable[ObjectType] = None, compression: str = None
+) -> dict[ObjectType, int]:
+    """Exports the configuration of Q
+
+    :param api: QApi to read the objects with
+    :param path: File for ndjson, directory for parquet
+    :param fmt: Optional. ndjson or parquet. Defaults to ndjson
+    :param object_types: Optional. Types to export. Defaults to all types.
+    :param compression: Optional. See export_ndjson or export_parquet.
+
+    :return: Number of exported objects per type
+    """
+    if fmt == "ndjson":
+        return export_ndjson(api, path, object_types=object_types, compression=compression)
+    if fmt == "parquet":
+        return export_parquet(api, path, object_types=object_types, compression=compression or "zstd")
+    raise ValueError(f"Unsupported format {fmt}")
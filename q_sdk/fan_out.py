@@ -0,0 +1,186 @@
+import enum
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Optional, Union
+
+from .bulk import fetch_objects, ref_ids
+from .main import ObjectType, QApi
+from .objects.base import Base
+
+logger = logging.getLogger("QApi")
+
+
+class HostSelector:
+    """Selects Hosts by their ID, proxy or variables. A Host has to match all given criteria.
+
+    :param ids: Optional. IDs of the Hosts
+    :param proxy_id: Optional. ID of the Proxy the Hosts are linked to
+    :param variables: Optional. Variables the Hosts must have with exactly these values
+    :param predicate: Optional. Callable that gets a Host as dict and returns whether it is selected
+    """
+    def __init__(
+            self, ids: Iterable[Union[str, int]] = None, proxy_id: Union[str, int] = None, variables: dict = None,
+            predicate: Callable[[dict], bool] = None
+    ):
+        self.ids = {str(x) for x in ids} if ids is not None else None
+        self.proxy_id = str(proxy_id) if proxy_id is not None else None
+        self.variables = variables or {}
+        self.predicate = predicate
+
+    def matches(self, host: dict) -> bool:
+        if self.ids is not None and str(host["id"]) not in self.ids:
+            return False
+        if self.proxy_id is not None and self.proxy_id not in ref_ids(host.get("linked_proxy")):
+            return False
+        host_variables = host.get("variables") or {}
+        if any(host_variables.get(k) != v for k, v in self.variables.items()):
+            return False
+        return self.predicate is None or self.predicate(host)
+
+    def select(self, api: QApi) -> list[dict]:
+        """Returns the selected Hosts as dicts
+
+        Hosts selected by ID are retrieved in chunks of 100 IDs, all others with a single listing.
+        """
+        if self.ids is not None:
+            hosts = fetch_objects(api, ObjectType.HOST, sorted(self.ids))
+        else:
+            hosts = api._make_stream_request("hosts")
+        return [x for x in hosts if self.matches(x)]
+
+
+class FanOutStatus(enum.Enum):
+    CREATED = "created"
+    """A Metric was created for the Host"""
+    UPDATED = "updated"
+    """The template was linked to the existing object"""
+    SKIPPED = "skipped"
+    """The template was already linked"""
+    FAILED = "failed"
+    """The request failed, see error"""
+
+
+class FanOutResult(Base):
+    """Result of a fan-out for a single Host
+
+    :param host_id: ID of the Host
+    :param status: FanOutStatus
+    :param object_id: ID of the created or changed object, i.e. the Metric or the Host
+    :param error: Error message if status is FAILED
+    """
+    def __init__(self, host_id: str, status: FanOutStatus, object_id: str = None, error: str = None):
+        super(FanOutResult, self).__init__()
+        self.host_id = host_id
+        self.status = status
+        self.object_id = object_id
+        self.error = error
+
+
+def _wait(ret) -> None:
+    # Updates return a Future if the write-behind queue is enabled
+    if isinstance(ret, Future):
+        ret.result()
+
+
+def _run(
+        hosts: list[dict], func: Callable[[dict], FanOutResult], max_workers: int,
+        progress: Optional[Callable[[int, int, FanOutResult], None]]
+) -> list[FanOutResult]:
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, host): str(host["id"]) for host in hosts}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as err:
+                logger.error(f"Fan-out to host {futures[future]} failed: {err}")
+                result = FanOutResult(futures[future], FanOutStatus.FAILED, error=str(err))
+            results.append(result)
+            if progress:
+                progress(len(results), len(futures), result)
+    return results
+
+
+def apply_metric_template(
+        api: QApi, selector: HostSelector, metric_template_id: Union[str, int], name: str = None,
+        max_workers: int = 8, progress: Callable[[int, int, FanOutResult], None] = None, **kwargs
+) -> list[FanOutResult]:
+    """Gives every selected Host a Metric that uses the MetricTemplate
+
+    The Hosts and the existing Metrics are retrieved once. Hosts that already have a Metric using the template, under
+    any name, are skipped. Otherwise, the template is linked to the Metric of the Host with the given name, or a new
+    Metric is created if there is none. Requests are sent concurrently.
+
+    :param api: QApi to use
+    :param selector: HostSelector of the Hosts
+    :param metric_template_id: ID of the MetricTemplate
+    :param name: Optional. Name of the Metrics. Defaults to the name of the MetricTemplate
+    :param max_workers: Optional. Number of concurrent requests. Defaults to 8
+    :param progress: Optional. Called after each Host with the number of finished Hosts, the number of selected
+    Hosts and the FanOutResult
+    :param kwargs: Optional. Further parameters of metric_create for created Metrics. Templates given in
+    metric_templates are linked in addition to the MetricTemplate.
+
+    :return: FanOutResult of each selected Host, in order of completion
+    """
+    template_id = str(metric_template_id)
+    create_templates = [x for x in ref_ids(kwargs.pop("metric_templates", None)) if x != template_id]
+    create_templates.append(template_id)
+    name = name or api.metric_template_get(template_id).name
+    hosts = selector.select(api)
+    host_ids = {str(x["id"]) for x in hosts}
+    with_template = {}
+    by_name = {}
+    for metric in api._make_stream_request(ObjectType.METRIC.value):
+        host_id = next(iter(ref_ids(metric.get("linked_host"))), None)
+        if host_id not in host_ids:
+            continue
+        if template_id in ref_ids(metric.get("metric_templates")):
+            with_template.setdefault(host_id, metric)
+        if metric.get("name") == name:
+            by_name[host_id] = metric
+
+    def apply(host: dict) -> FanOutResult:
+        host_id = str(host["id"])
+        if host_id in with_template:
+            return FanOutResult(host_id, FanOutStatus.SKIPPED, str(with_template[host_id]["id"]))
+        metric = by_name.get(host_id)
+        if metric is None:
+            metric_id = api.metric_create(name, host_id, metric_templates=create_templates, **kwargs)
+            return FanOutResult(host_id, FanOutStatus.CREATED, str(metric_id))
+        templates = ref_ids(metric.get("metric_templates"))
+        _wait(api.metric_update(metric["id"], {"metric_templates": templates + [template_id]}))
+        return FanOutResult(host_id, FanOutStatus.UPDATED, str(metric["id"]))
+
+    return _run(hosts, apply, max_workers, progress)
+
+
+def apply_host_template(
+        api: QApi, selector: HostSelector, host_template_id: Union[str, int], max_workers: int = 8,
+        progress: Callable[[int, int, FanOutResult], None] = None
+) -> list[FanOutResult]:
+    """Links the HostTemplate to every selected Host
+
+    The Hosts are retrieved once. Hosts that already use the template are skipped, the others are updated
+    concurrently. Existing templates of a Host are kept, the new one is appended.
+
+    :param api: QApi to use
+    :param selector: HostSelector of the Hosts
+    :param host_template_id: ID of the HostTemplate
+    :param max_workers: Optional. Number of concurrent requests. Defaults to 8
+    :param progress: Optional. Called after each Host with the number of finished Hosts, the number of selected
+    Hosts and the FanOutResult
+
+    :return: FanOutResult of each selected Host, in order of completion
+    """
+    template_id = str(host_template_id)
+
+    def apply(host: dict) -> FanOutResult:
+        host_id = str(host["id"])
+        templates = ref_ids(host.get("host_templates"))
+        if template_id in templates:
+            return FanOutResult(host_id, FanOutStatus.SKIPPED, host_id)
+        _wait(api.host_update(host_id, {"host_templates": templates + [template_id]}))
+        return FanOutResult(host_id, FanOutStatus.UPDATED, host_id)
+
+    return _run(selector.select(api), apply, max_workers, progress)
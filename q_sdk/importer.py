@@ -0,0 +1,291 @@
+import argparse
+import csv
+import gzip
+import inspect
+import json
+import logging
+import os
+import sys
+import typing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, Optional
+
+from .main import QApi
+from .validation import create_kwargs_to_payload, get_validator
+
+logger = logging.getLogger("QApi")
+
+IMPORT_TYPES = {"host": "hosts", "metric": "metrics", "contact": "contacts"}
+"""Types that can be imported and their endpoints. Rows are passed to the <type>_create method of QApi."""
+
+
+class ImportRowError(ValueError):
+    def __init__(self, line: int, msg: str):
+        self.line = line
+        self.msg = msg
+        super(ImportRowError, self).__init__(f"Line {line}: {msg}")
+
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def read_rows(path: str, fmt: str = None) -> Iterator[tuple[int, dict]]:
+    """Lazily reads the rows of a NDJSON or CSV file
+
+    :param path: Path of the file. Files ending with .gz are decompressed.
+    :param fmt: Optional. ndjson or csv. Defaults to the extension of the file.
+
+    :return: Iterator over the line number and the row
+    """
+    if fmt is None:
+        fmt = "csv" if path.removesuffix(".gz").endswith(".csv") else "ndjson"
+    with _open(path) as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_no, json.loads(line)
+                    except json.JSONDecodeError as err:
+                        yield line_no, ImportRowError(line_no, f"Invalid JSON: {err}")
+
+
+def _coerce(value, annotation):
+    """Converts a value read from CSV to the type of the parameter"""
+    if not isinstance(value, str):
+        return value
+    if annotation is bool:
+        return value.strip().lower() in ("1", "true", "yes")
+    if value[:1] in ("[", "{") and annotation is not str:
+        return json.loads(value)
+    if annotation is dict or typing.get_origin(annotation) is dict:
+        return json.loads(value)
+    return value
+
+
+class RowMapper:
+    """Maps rows onto the arguments of the create methods of QApi and validates them
+
+    :param api: QApi whose methods are called
+    :param default_type: Optional. Type of rows without a type column
+    """
+    def __init__(self, api: QApi, default_type: str = None):
+        self.api = api
+        self.default_type = default_type
+        self._signatures = {x: inspect.signature(getattr(api, f"{x}_create")) for x in IMPORT_TYPES}
+        # The annotations of QApi are strings, they are resolved once here
+        self._hints = {x: typing.get_type_hints(getattr(api, f"{x}_create")) for x in IMPORT_TYPES}
+
+    def map(self, line: int, row: dict) -> tuple[str, dict]:
+        """Returns the type and the keyword arguments of the create method for a row
+
+        :raises ImportRowError: If the row is invalid
+        """
+        row = {k: v for k, v in row.items() if k is not None and v is not None and v != ""}
+        object_type = row.pop("type", self.default_type)
+        if object_type not in self._signatures:
+            raise ImportRowError(line, f"Unknown type {object_type!r}, expected one of {', '.join(IMPORT_TYPES)}")
+        signature = self._signatures[object_type]
+        unknown = row.keys() - signature.parameters.keys()
+        if unknown:
+            raise ImportRowError(line, f"Unknown columns for {object_type}: {', '.join(sorted(unknown))}")
+        try:
+            hints = self._hints[object_type]
+            kwargs = {k: _coerce(v, hints.get(k)) for k, v in row.items()}
+        except json.JSONDecodeError as err:
+            raise ImportRowError(line, f"Invalid JSON value: {err}")
+        try:
+            signature.bind(**kwargs)
+        except TypeError as err:
+            raise ImportRowError(line, str(err))
+        errors = get_validator(IMPORT_TYPES[object_type]).errors(create_kwargs_to_payload(kwargs))
+        if errors:
+            raise ImportRowError(line, "; ".join(errors))
+        return object_type, kwargs
+
+
+class Checkpoint:
+    """Progress of an import, stored as JSON
+
+    All lines up to position are processed. Lines after position that were processed out of order are stored in done.
+    Failed lines are stored in failed. Lines whose request failed are processed again when the import is resumed,
+    lines rejected by the local validation only if retry_failed is set. They stay in failed until they succeed.
+
+    :param path: Path of the checkpoint file
+    :param retry_failed: Optional. Also process the lines rejected by the local validation again. Defaults to False
+    """
+    def __init__(self, path: str, retry_failed: bool = False):
+        self.path = path
+        self.position = 0
+        self.done = set()
+        self.failed = {}
+        """Failed lines and their errors, keyed by line"""
+        self.retry = set()
+        """Lines that failed in an earlier run and are processed again"""
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.position = state["position"]
+            self.done = set(state["done"])
+            for x in state["failed"]:
+                self.failed[x["line"]] = x
+                if retry_failed or x.get("request"):
+                    self.retry.add(x["line"])
+
+    def is_done(self, line: int) -> bool:
+        return (line <= self.position or line in self.done) and line not in self.retry
+
+    def fail(self, line: int, error: str, request: bool) -> None:
+        """Records a failed line. request is True if the request failed, so the line is retried on resume."""
+        self.failed[line] = {"line": line, "error": error, "request": request}
+
+    def mark(self, line: int, pending: set, success: bool = True) -> None:
+        """Marks a line as processed. pending are the lines that are still being processed."""
+        if line in self.retry:
+            self.retry.discard(line)
+            if success:
+                del self.failed[line]
+        self.done.add(line)
+        low = min(pending) if pending else None
+        for x in sorted(self.done):
+            if low is not None and x >= low:
+                break
+            self.position = max(self.position, x)
+        self.done = {x for x in self.done if x > self.position}
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "position": self.position, "done": sorted(self.done),
+                "failed": [self.failed[x] for x in sorted(self.failed)]
+            }, f)
+        os.replace(tmp, self.path)
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        """Number of imported rows. Rows of objects that already existed update them."""
+        self.skipped = 0
+        self.failed = []
+        """List of ImportRowError"""
+
+
+def import_file(
+        api: QApi, path: str, default_type: str = None, fmt: str = None, checkpoint_path: Optional[str] = None,
+        max_workers: int = 8, checkpoint_every: int = 100, retry_failed: bool = False
+) -> ImportResult:
+    """Imports Hosts, Metrics and Contacts from a NDJSON or CSV file
+
+    Each row holds the arguments of the matching *_create method of QApi, and optionally a type column with one of
+    IMPORT_TYPES. Rows are read lazily, validated locally before any request and imported concurrently with the
+    matching *_upsert method, so rows that were sent before an interruption don't create duplicates on resume.
+    Invalid or failed rows are logged and recorded in the result and the checkpoint.
+
+    The progress is written to a checkpoint file, also if the import is interrupted. If it exists, the import
+    resumes after the processed rows. Rows whose request failed, e.g. because the server was unavailable, are
+    imported again on resume.
+
+    :param api: QApi to create the objects with
+    :param path: Path of the file. Files ending with .gz are decompressed.
+    :param default_type: Optional. Type of rows without a type column
+    :param fmt: Optional. ndjson or csv. Defaults to the extension of the file.
+    :param checkpoint_path: Optional. Path of the checkpoint file. Defaults to path + .checkpoint
+    :param max_workers: Optional. Number of concurrent requests. Defaults to 8
+    :param checkpoint_every: Optional. Number of rows after which the checkpoint is written. Defaults to 100
+    :param retry_failed: Optional. Also import the rows rejected by the local validation in an earlier run again.
+    Defaults to False
+    """
+    mapper = RowMapper(api, default_type)
+    checkpoint = Checkpoint(checkpoint_path or f"{path}.checkpoint", retry_failed=retry_failed)
+    result = ImportResult()
+    in_flight = {}
+
+    def processed(line: int, err: ImportRowError = None, request: bool = False) -> None:
+        if err is None:
+            result.created += 1
+        else:
+            logger.error(str(err))
+            result.failed.append(err)
+            checkpoint.fail(line, err.msg, request)
+        checkpoint.mark(line, set(in_flight.values()), success=err is None)
+        if (result.created + len(result.failed)) % checkpoint_every == 0:
+            checkpoint.save()
+
+    def collect(futures) -> None:
+        for future in futures:
+            # An interruption, e.g. KeyboardInterrupt, propagates and leaves the line pending
+            err = future.exception()
+            if err is not None and not isinstance(err, Exception):
+                raise err
+            line = in_flight.pop(future)
+            processed(line, ImportRowError(line, str(err)) if err else None, request=True)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for line, row in read_rows(path, fmt):
+            if checkpoint.is_done(line):
+                result.skipped += 1
+                continue
+            try:
+                if isinstance(row, ImportRowError):
+                    raise row
+                if not isinstance(row, dict):
+                    raise ImportRowError(line, "Row is not an object")
+                object_type, kwargs = mapper.map(line, row)
+            except ImportRowError as err:
+                processed(line, err)
+                continue
+            in_flight[executor.submit(getattr(api, f"{object_type}_upsert"), **kwargs)] = line
+            # Limit the rows held in memory
+            if len(in_flight) >= max_workers * 2:
+                collect(wait(list(in_flight), return_when=FIRST_COMPLETED).done)
+        collect(list(in_flight))
+    finally:
+        # On an interruption, rows that were not started yet are cancelled and those that finished are recorded
+        executor.shutdown(wait=True, cancel_futures=True)
+        collect([
+            x for x in list(in_flight)
+            if not x.cancelled() and (x.exception() is None or isinstance(x.exception(), Exception))
+        ])
+        checkpoint.save()
+    return result
+
+
+def main(argv: list[str] = None) -> int:
+    """Console entry point of the importer"""
+    parser = argparse.ArgumentParser(description="Import Hosts, Metrics and Contacts from NDJSON or CSV into Q")
+    parser.add_argument("path", help="NDJSON or CSV file, optionally gzip compressed")
+    parser.add_argument("--uri", required=True, help="URI of the API, e.g. https://example.com/api/v1/")
+    parser.add_argument("--username", default=os.environ.get("Q_USERNAME", ""))
+    parser.add_argument("--password", default=os.environ.get("Q_PASSWORD", ""), help="Defaults to $Q_PASSWORD")
+    parser.add_argument("--type", choices=IMPORT_TYPES, help="Type of rows without a type column")
+    parser.add_argument("--format", choices=("ndjson", "csv"), help="Defaults to the extension of the file")
+    parser.add_argument("--checkpoint", help="Path of the checkpoint file. Defaults to PATH.checkpoint")
+    parser.add_argument("--workers", type=int, default=8, help="Number of concurrent requests")
+    parser.add_argument("--no-verify", action="store_true", help="Don't verify SSL/TLS certificates")
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Also import rows rejected by the validation in an earlier run"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    api = QApi(username=args.username, password=args.password, uri=args.uri, verify=not args.no_verify)
+    api.authenticate()
+    result = import_file(
+        api, args.path, default_type=args.type, fmt=args.format, checkpoint_path=args.checkpoint,
+        max_workers=args.workers, retry_failed=args.retry_failed
+    )
+    print(f"Created: {result.created}, skipped: {result.skipped}, failed: {len(result.failed)}")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,39 @@
+from __future__ import annotations
+
+import codecs
+import collections
 import enum
 import json
 import logging
 import os.path
-from pprint import pprint
-from typing import Union
-
-import httpx
-
-from error import HttpStatusCodeException
-from objects.check import Check, CheckParam
-from objects.contact import Contact, ContactParam
-from objects.contact_group import ContactGroup, ContactGroupParam
-from objects.global_variable import GlobalVariable
-from objects.host import Host, HostParam
-from objects.host_template import HostTemplate, HostTemplateParam
-from objects.metric import Metric
-from objects.metric_template import MetricTemplate, MetricTemplateParam
-from objects.proxy import Proxy, ProxyParam
-from objects.time_period import TimePeriod, TimePeriodParam
+import time
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+from .compression import RequestStats
+from .endpoints import Balancing, EndpointPool
+from .error import HttpStatusCodeException
+from .name_index import NameIndex, index_key, values_equal
+from .objects.base import Base
+from .objects.check import Check, CheckParam
+from .objects.contact import Contact, ContactParam
+from .objects.contact_group import ContactGroup, ContactGroupParam
+from .objects.global_variable import GlobalVariable
+from .objects.host import Host, HostParam
+from .objects.host_template import HostTemplate, HostTemplateParam
+from .objects.metric import Metric
+from .objects.metric_template import MetricTemplate, MetricTemplateParam
+from .objects.proxy import Proxy, ProxyParam
+from .objects.time_period import TimePeriod, TimePeriodParam
+from .stream import iter_json_array
+
+# httpx and the modules of optional features are imported on first use to keep the import of q_sdk fast
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .columnar import ColumnFormat
+    from .compression import Compression
+    from .revalidation import RevalidationStats
+    from .session import SessionStore
 
 logger = logging.getLogger("QApi")
 
@@ -29,30 +45,181 @@ class Method(enum.Enum):
     DELETE = "delete"
 
 
+class ObjectType(enum.Enum):
+    """Types of objects in Q. The value is the name of the endpoint of the type."""
+    CHECK = "checks"
+    METRIC = "metrics"
+    TIME_PERIOD = "timeperiods"
+    GLOBAL_VARIABLE = "globalvariables"
+    METRIC_TEMPLATE = "metrictemplates"
+    CONTACT_GROUP = "contactgroups"
+    CONTACT = "contacts"
+    HOST_TEMPLATE = "hosttemplates"
+    HOST = "hosts"
+    PROXY = "proxies"
+
+
+OBJECT_CLASSES = {
+    ObjectType.CHECK: Check,
+    ObjectType.METRIC: Metric,
+    ObjectType.TIME_PERIOD: TimePeriod,
+    ObjectType.GLOBAL_VARIABLE: GlobalVariable,
+    ObjectType.METRIC_TEMPLATE: MetricTemplate,
+    ObjectType.CONTACT_GROUP: ContactGroup,
+    ObjectType.CONTACT: Contact,
+    ObjectType.HOST_TEMPLATE: HostTemplate,
+    ObjectType.HOST: Host,
+    ObjectType.PROXY: Proxy,
+}
+"""Maps an ObjectType to the class representing its objects"""
+
+REFERENCES = {
+    ObjectType.CHECK: {},
+    ObjectType.TIME_PERIOD: {},
+    ObjectType.GLOBAL_VARIABLE: {},
+    ObjectType.PROXY: {},
+    ObjectType.METRIC_TEMPLATE: {
+        "linked_check": ObjectType.CHECK,
+        "metric_templates": ObjectType.METRIC_TEMPLATE,
+        "scheduling_period": ObjectType.TIME_PERIOD,
+        "notification_period": ObjectType.TIME_PERIOD,
+    },
+    ObjectType.HOST_TEMPLATE: {
+        "linked_check": ObjectType.CHECK,
+        "host_templates": ObjectType.HOST_TEMPLATE,
+        "scheduling_period": ObjectType.TIME_PERIOD,
+        "notification_period": ObjectType.TIME_PERIOD,
+    },
+    ObjectType.CONTACT: {
+        "linked_host_notifications": ObjectType.CHECK,
+        "linked_host_notification_period": ObjectType.TIME_PERIOD,
+        "linked_metric_notifications": ObjectType.CHECK,
+        "linked_metric_notification_period": ObjectType.TIME_PERIOD,
+    },
+    ObjectType.CONTACT_GROUP: {
+        "linked_contacts": ObjectType.CONTACT,
+    },
+    ObjectType.HOST: {
+        "linked_proxy": ObjectType.PROXY,
+        "linked_check": ObjectType.CHECK,
+        "host_templates": ObjectType.HOST_TEMPLATE,
+        "scheduling_period": ObjectType.TIME_PERIOD,
+        "notification_period": ObjectType.TIME_PERIOD,
+        "linked_contacts": ObjectType.CONTACT,
+        "linked_contact_groups": ObjectType.CONTACT_GROUP,
+    },
+    ObjectType.METRIC: {
+        "linked_check": ObjectType.CHECK,
+        "linked_host": ObjectType.HOST,
+        "metric_templates": ObjectType.METRIC_TEMPLATE,
+        "scheduling_period": ObjectType.TIME_PERIOD,
+        "notification_period": ObjectType.TIME_PERIOD,
+    },
+}
+"""Maps an ObjectType to its fields that reference other objects and the type of the referenced objects"""
+
+WRITE_ONLY_FIELDS = {
+    ObjectType.CHECK: {"check_type"},
+}
+"""Fields that can be written, but aren't returned by the API"""
+
+
 class QApi:
     """The main class to initialize.
 
     :param username: Username of Q account
     :param password: Password of Q account
     :param uri: Uri of the API Endpoint. Something like https://example.com/api/v1/
+    Can be a list of URIs of replicas. The first one is the primary and receives all writes, reads are distributed
+    across all of them. Endpoints failing repeatedly are taken out of rotation temporarily, see EndpointPool.
     :param verify: Verify SSL/TLS. Defaults to True
+    :param session_store: Optional. SessionStore to persist the authenticated session in, e.g. FileSessionStore.
+    A stored session is reused, so the first call to authenticate() doesn't need a request.
+    Expired sessions are renewed when the server answers with 401.
+    :param balancing: Optional. Strategy to distribute reads if multiple URIs are given. Defaults to round-robin.
+    :param compression: Optional. Compression of request bodies larger than compression_threshold. Responses are
+    compressed as negotiated by httpx. The sizes of each request are recorded in request_stats.
+    :param compression_threshold: Optional. Minimal size of a request body to compress, in bytes. Defaults to 4096
+    :param validate: Optional. Validate create and update payloads locally before sending them and raise a
+    ValidationError if they have problems. Defaults to True
+    :param conditional_get: Optional. Store answers of GETs with their ETag or Last-Modified header and revalidate
+    them on repeated GETs. Answers with 304 Not Modified are served from the store, see revalidation_stats.
+    Defaults to False
+    :param conditional_get_size: Optional. Maximum number of stored answers. Defaults to 256
 
     :returns: Instance of Q API
     """
-    def __init__(self, username="", password="", uri="", verify=True):
+    def __init__(
+            self, username="", password="", uri: Union[str, list[str]] = "", verify=True,
+            session_store: SessionStore = None, balancing: Balancing = Balancing.ROUND_ROBIN,
+            compression: Compression = None, compression_threshold: int = 4096, validate: bool = True,
+            conditional_get: bool = False, conditional_get_size: int = 256
+    ):
         self.username = username
         self.password = password
-        self.uri = uri
-        self.client = httpx.Client(verify=verify)
+        self.endpoints = EndpointPool([uri] if isinstance(uri, str) else uri, balancing=balancing)
+        self.uri = self.endpoints.primary
+        self.verify = verify
+        import httpx
+        from .compression import Compression, compressor
 
-    def authenticate(self):
+        self.client = httpx.Client(verify=verify)
+        self.compression = Compression(compression) if compression else None
+        self.compression_threshold = compression_threshold
+        self._compress = compressor(self.compression) if compression else None
+        self.request_stats = collections.deque(maxlen=1000)
+        """RequestStats of the latest requests"""
+        self.validate = validate
+        self.settings = {
+            "username": username, "password": password, "uri": list(self.endpoints.uris), "verify": verify,
+            "session_store": session_store, "balancing": balancing, "compression": compression,
+            "compression_threshold": compression_threshold, "validate": validate,
+            "conditional_get": conditional_get, "conditional_get_size": conditional_get_size,
+        }
+        """Arguments of the constructor, e.g. to create an equivalent QApi in another process"""
+        self._response_cache = None
+        if conditional_get:
+            from .revalidation import ResponseCache
+
+            self._response_cache = ResponseCache(conditional_get_size)
+        self._write_behind = None
+        self._batch_loaders = {}
+        self._name_index = NameIndex()
+        self.session_store = session_store
+        self._session_reused = False
+        if session_store:
+            from .session import load_cookies
+
+            cookies = session_store.load(self._session_key)
+            if cookies and load_cookies(self.client.cookies.jar, cookies):
+                logger.debug("Reusing stored session")
+                self._session_reused = True
+
+    @property
+    def revalidation_stats(self) -> Optional[RevalidationStats]:
+        """Counters of the conditional GETs, None if conditional_get is disabled"""
+        return self._response_cache.stats if self._response_cache else None
+
+    @property
+    def _session_key(self) -> str:
+        return f"{self.username}@{self.uri}"
+
+    def authenticate(self, uri: str = None):
+        """Authenticate against the API
+
+        :param uri: Optional. URI of the endpoint to authenticate against. Defaults to the primary endpoint.
+        """
+        if self._session_reused:
+            # The stored session is used until the server rejects it
+            self._session_reused = False
+            return
         for i in range(1, 4):
             try:
                 data = {
                     "username": self.username,
                     "password": self.password
                 }
-                ret = self.client.post(os.path.join(self.uri, "authenticate"), json=data)
+                ret = self.client.post(os.path.join(uri or self.uri, "authenticate"), json=data)
                 if not ret.status_code == 200:
                     raise PermissionError("Authentication failed")
                 try:
@@ -65,33 +232,326 @@ class QApi:
                     raise PermissionError("Got malformed json")
                 if decoded["success"]:
                     logger.debug("Authentication was successful")
+                    if self.session_store:
+                        from .session import dump_cookies
+
+                        self.session_store.save(self._session_key, dump_cookies(self.client.cookies.jar))
                     break
             except PermissionError:
                 logger.error(f"Authentication failed {i}/3")
         else:
             exit(1)
 
-    def _make_request(self, method: Method, endpoint: str, data: dict = None, timeout: int = 20):
+    def _send(
+            self, method: Method, uri: str, endpoint: str, data: dict = None, timeout: int = 20, headers: dict = None
+    ):
+        url = os.path.join(uri, endpoint)
+        body = sent = b""
         if method == Method.GET:
-            ret = self.client.get(os.path.join(self.uri, endpoint), params=data, timeout=timeout)
-        elif method == Method.POST:
-            ret = self.client.post(os.path.join(self.uri, endpoint), json=data,  timeout=timeout)
-        elif method == Method.PUT:
-            ret = self.client.put(os.path.join(self.uri, endpoint), json=data,  timeout=timeout)
+            ret = self.client.get(url, params=data, headers=headers, timeout=timeout)
         elif method == Method.DELETE:
-            ret = self.client.delete(os.path.join(self.uri, endpoint), timeout=timeout)
+            ret = self.client.delete(url, timeout=timeout)
+        else:
+            func = self.client.post if method == Method.POST else self.client.put
+            if data is None:
+                ret = func(url, timeout=timeout)
+            else:
+                body = sent = json.dumps(data).encode()
+                headers = {"Content-Type": "application/json"}
+                if self._compress and len(body) >= self.compression_threshold:
+                    sent = self._compress(body)
+                    headers["Content-Encoding"] = self.compression.value
+                ret = func(url, content=sent, headers=headers, timeout=timeout)
+        self.request_stats.append(
+            RequestStats(method.value, endpoint, len(body), len(sent), len(ret.content), ret.num_bytes_downloaded)
+        )
+        return ret
 
+    def _make_request(self, method: Method, endpoint: str, data: dict = None, timeout: int = 20):
+        import httpx
+
+        if self.validate and method in (Method.POST, Method.PUT):
+            from .validation import validate_request
+
+            validate_request(method.value, endpoint, data)
+        if self._write_behind and method in (Method.POST, Method.DELETE):
+            # Queued updates were issued before this write, so they are sent first.
+            # Those of a deleted object would fail afterwards and are dropped.
+            if method == Method.DELETE and self._write_behind.discard(endpoint):
+                logger.debug(f"Dropped pending changes of deleted {endpoint}")
+            self._write_behind.flush()
+        cache_key = conditional = None
+        if method == Method.GET and self._response_cache:
+            cache_key = self._response_cache.key(endpoint, data)
+            conditional = self._response_cache.headers(cache_key)
+        # Only reads are idempotent, so only they are distributed and retried on another endpoint
+        candidates = self.endpoints.read_order() if method == Method.GET else [self.endpoints.primary]
+        for attempt, uri in enumerate(candidates):
+            last = attempt == len(candidates) - 1
+            start = time.monotonic()
+            try:
+                ret = self._send(method, uri, endpoint, data, timeout, headers=conditional)
+            except httpx.TransportError:
+                self.endpoints.record_failure(uri)
+                if last:
+                    raise
+                continue
+            if ret.status_code < 500:
+                self.endpoints.record_success(uri, time.monotonic() - start)
+                break
+            self.endpoints.record_failure(uri)
+            if last:
+                break
+
+        if ret.status_code == 304 and conditional:
+            decoded = self._response_cache.not_modified(cache_key)
+            if decoded is not None:
+                return decoded
+            # The stored answer was dropped by a write in the meantime
+            return self._make_request(method, endpoint, data, timeout)
         if ret.status_code != 200 and ret.status_code != 201:
             if ret.status_code == 401:
                 logger.debug(f"Authentication failed, trying to authenticate..")
-                self.authenticate()
+                self._session_reused = False
+                self.authenticate(uri)
                 return self._make_request(method, endpoint, data)
             raise HttpStatusCodeException(ret.status_code, ret.text)
         decoded = json.loads(ret.text)
         if not decoded["success"]:
+            from pprint import pprint
+
             pprint(decoded["message"])
+        elif method != Method.GET:
+            self._name_index.observe(method.value, endpoint, data, decoded.get("data"))
+            if self._response_cache:
+                self._response_cache.invalidate(endpoint)
+        elif self._response_cache:
+            self._response_cache.store(cache_key, ret.headers, decoded, len(ret.content))
         return decoded
 
+    def _make_stream_request(self, endpoint: str, data: dict = None, timeout: int = 20) -> Iterator[dict]:
+        """Execute a GET request and yield the elements of the data array while the response body is received
+
+        The Q API has no pagination parameters, so the listing is streamed in one response and parsed incrementally.
+        """
+        import httpx
+
+        candidates = self.endpoints.read_order()
+        for attempt, uri in enumerate(candidates):
+            last = attempt == len(candidates) - 1
+            start = time.monotonic()
+            started = False
+            try:
+                with self.client.stream("GET", os.path.join(uri, endpoint), params=data, timeout=timeout) as ret:
+                    if ret.status_code >= 500:
+                        self.endpoints.record_failure(uri)
+                        if not last:
+                            continue
+                    else:
+                        self.endpoints.record_success(uri, time.monotonic() - start)
+                    if ret.status_code != 200:
+                        ret.read()
+                        if ret.status_code == 401:
+                            logger.debug("Authentication failed, trying to authenticate..")
+                            self._session_reused = False
+                            self.authenticate(uri)
+                            yield from self._make_stream_request(endpoint, data, timeout)
+                            return
+                        raise HttpStatusCodeException(ret.status_code, ret.text)
+                    started = True
+                    stats = RequestStats("get", endpoint)
+                    decoder = codecs.getincrementaldecoder(ret.encoding or "utf-8")()
+
+                    def chunks():
+                        for chunk in ret.iter_bytes():
+                            stats.response_bytes += len(chunk)
+                            yield decoder.decode(chunk)
+                        yield decoder.decode(b"", final=True)
+
+                    yield from iter_json_array(chunks())
+                    stats.response_received_bytes = ret.num_bytes_downloaded
+                    self.request_stats.append(stats)
+                    return
+            except httpx.TransportError:
+                self.endpoints.record_failure(uri)
+                # Elements were already yielded, retrying would yield them twice
+                if started or last:
+                    raise
+
+    def iter_objects(self, object_type: ObjectType) -> Iterator[Base]:
+        """This method is used to iterate over all objects of a type without loading the complete listing at once
+
+        The response is parsed while it is received and every object is yielded as soon as it is complete,
+        so the memory usage stays constant regardless of the number of objects.
+
+        :param object_type: Type of the objects to retrieve
+        :return: Iterator over the objects
+        """
+        cls = OBJECT_CLASSES[object_type]
+        for x in self._make_stream_request(object_type.value):
+            yield cls(**x)
+
+    def get_columns(
+            self, object_type: ObjectType, fields: list[str] = None,
+            fmt: Union[ColumnFormat, str] = "auto"
+    ):
+        """This method is used to retrieve all objects of a type as columns instead of a list of objects
+
+        The listing is streamed and no objects are constructed. Strings are interned or dictionary encoded,
+        which makes aggregations over large inventories cheap, e.g. counting metrics per host.
+
+        :param object_type: Type of the objects to retrieve
+        :param fields: Optional. List of attributes to retrieve. Defaults to all attributes of the object class.
+        :param fmt: Optional. Format of the result, see ColumnFormat. Defaults to the best installed library.
+        :return: pyarrow.Table, pandas.DataFrame, dict of numpy arrays or dict of lists
+        """
+        from .columnar import ColumnFormat, collect_columns, default_fields, to_columnar
+
+        if not fields:
+            fields = default_fields(OBJECT_CLASSES[object_type])
+        columns = collect_columns(self._make_stream_request(object_type.value), fields)
+        return to_columnar(columns, ColumnFormat(fmt))
+
+    def iter_checks(self) -> Iterator[Check]:
+        """This method is used to iterate over all checks. See iter_objects."""
+        return self.iter_objects(ObjectType.CHECK)
+
+    def iter_metrics(self) -> Iterator[Metric]:
+        """This method is used to iterate over all metrics. See iter_objects."""
+        return self.iter_objects(ObjectType.METRIC)
+
+    def iter_time_periods(self) -> Iterator[TimePeriod]:
+        """This method is used to iterate over all TimePeriods. See iter_objects."""
+        return self.iter_objects(ObjectType.TIME_PERIOD)
+
+    def iter_global_variables(self) -> Iterator[GlobalVariable]:
+        """This method is used to iterate over all GlobalVariables. See iter_objects."""
+        return self.iter_objects(ObjectType.GLOBAL_VARIABLE)
+
+    def iter_metric_templates(self) -> Iterator[MetricTemplate]:
+        """This method is used to iterate over all MetricTemplates. See iter_objects."""
+        return self.iter_objects(ObjectType.METRIC_TEMPLATE)
+
+    def iter_contact_groups(self) -> Iterator[ContactGroup]:
+        """This method is used to iterate over all ContactGroups. See iter_objects."""
+        return self.iter_objects(ObjectType.CONTACT_GROUP)
+
+    def iter_contacts(self) -> Iterator[Contact]:
+        """This method is used to iterate over all Contacts. See iter_objects."""
+        return self.iter_objects(ObjectType.CONTACT)
+
+    def iter_host_templates(self) -> Iterator[HostTemplate]:
+        """This method is used to iterate over all HostTemplates. See iter_objects."""
+        return self.iter_objects(ObjectType.HOST_TEMPLATE)
+
+    def iter_hosts(self) -> Iterator[Host]:
+        """This method is used to iterate over all Hosts. See iter_objects."""
+        return self.iter_objects(ObjectType.HOST)
+
+    def iter_proxies(self) -> Iterator[Proxy]:
+        """This method is used to iterate over all Proxies. See iter_objects."""
+        return self.iter_objects(ObjectType.PROXY)
+
+    def _update(self, endpoint: str, changes: dict) -> Optional[Future]:
+        if self._write_behind:
+            if self.validate:
+                from .validation import validate_request
+
+                # Reject invalid changes now instead of when the queue is flushed
+                validate_request(Method.PUT.value, endpoint, changes)
+            return self._write_behind.submit(endpoint, changes)
+        self._make_request(Method.PUT, endpoint, data=changes)
+
+    def enable_write_behind(self, max_pending: int = 100, max_delay: float = 1.0) -> None:
+        """This method is used to enable the write-behind queue for updates
+
+        Afterwards, the *_update methods don't send their changes immediately. Changes to the same object are
+        merged, later keys override earlier ones, and written as one request.
+        The queue is flushed if max_pending objects have pending changes, max_delay seconds after the first change
+        or if flush() is called. The update methods return a Future that resolves when the change is written.
+        Creates and deletes are not queued. They flush the queue first, and a delete cancels the pending changes of
+        the deleted object.
+
+        :param max_pending: Optional. Maximum number of objects with pending changes. Defaults to 100
+        :param max_delay: Optional. Maximum time in seconds a change is delayed. Defaults to 1
+        """
+        from .write_behind import WriteBehindQueue
+
+        self._write_behind = WriteBehindQueue(
+            lambda endpoint, changes: self._make_request(Method.PUT, endpoint, data=changes),
+            max_pending=max_pending, max_delay=max_delay
+        )
+
+    def flush(self) -> None:
+        """This method is used to write all pending changes of the write-behind queue"""
+        if self._write_behind:
+            self._write_behind.flush()
+
+    def _get_one(self, object_type: ObjectType, object_id: Union[str, int]) -> dict:
+        loader = self._batch_loaders.get(object_type)
+        if loader:
+            return loader.load(object_id).result()
+        return self._make_request(Method.GET, f"{object_type.value}/{object_id}")["data"]
+
+    def enable_batching(
+            self, object_types: list[ObjectType] = None, window: float = 0.005, max_batch: int = 100
+    ) -> None:
+        """This method is used to batch concurrent gets of single objects
+
+        Afterwards, the *_get methods collect the IDs requested within window seconds, e.g. by many threads, and
+        retrieve them with one filtered listing per type. Every caller still gets its own object, a missing one
+        raises HttpStatusCodeException with status code 404. Each single get waits up to window seconds, so
+        batching only pays off with concurrent callers.
+
+        :param object_types: Optional. Types to batch. Defaults to all types
+        :param window: Optional. Time in seconds gets are collected. Defaults to 0.005
+        :param max_batch: Optional. Maximum number of IDs per request. Defaults to 100
+        """
+        from .batching import BatchLoader
+
+        for object_type in object_types or ObjectType:
+            self._batch_loaders[object_type] = BatchLoader(
+                lambda ids, endpoint=object_type.value: self._make_request(
+                    Method.GET, endpoint, {"filter": ids}
+                )["data"],
+                window=window, max_batch=max_batch
+            )
+
+    def disable_batching(self) -> None:
+        """This method is used to send gets of single objects immediately again"""
+        loaders, self._batch_loaders = self._batch_loaders, {}
+        for loader in loaders.values():
+            loader.dispatch()
+
+    def _upsert(self, object_type: ObjectType, create, name: str, **kwargs) -> int:
+        endpoint = object_type.value
+        if not self._name_index.loaded(endpoint):
+            self._name_index.load(endpoint, self._make_stream_request(endpoint))
+        from .validation import create_kwargs_to_payload
+
+        params = create_kwargs_to_payload(kwargs)
+        existing = self._name_index.get(endpoint, index_key(endpoint, dict(params, name=name)))
+        if existing is None:
+            return create(name, **kwargs)
+        references = REFERENCES[object_type]
+        write_only = WRITE_ONLY_FIELDS.get(object_type, set())
+        changes = {
+            x: params[x] for x in params
+            if x not in write_only and not values_equal(existing.get(x), params[x], reference=x in references)
+        }
+        if changes:
+            self._update(f"{endpoint}/{existing['id']}", changes)
+        return existing["id"]
+
+    def reset_name_index(self, object_type: ObjectType = None) -> None:
+        """This method is used to drop the name index used by the *_upsert methods
+
+        Use it if objects were changed by someone else. The index is loaded again on the next upsert.
+
+        :param object_type: Optional. Type of the index to drop. If None, the indexes of all types are dropped.
+        """
+        self._name_index.invalidate(object_type.value if object_type else None)
+
     def check_get(
             self, *,
             check_id: Union[list, str, int] = None,
@@ -111,8 +571,10 @@ class QApi:
             data["values"] = values
         if check_id:
             if isinstance(check_id, str) or isinstance(check_id, int):
-                ret = self._make_request(Method.GET, f"checks/{str(check_id)}", data=data)
-                return Check(**ret["data"])
+                if values:
+                    ret = self._make_request(Method.GET, f"checks/{str(check_id)}", data=data)
+                    return Check(**ret["data"])
+                return Check(**self._get_one(ObjectType.CHECK, check_id))
         ret = self._make_request(Method.GET, "checks", data=data)
         return [Check(**x) for x in ret["data"]]
 
@@ -133,14 +595,26 @@ class QApi:
             params["check_type"] = check_type
         return self._make_request(Method.POST, "checks", params)["data"]
 
-    def check_update(self, check_id: Union[str, int], changes: dict) -> None:
+    def check_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a Check or update the existing Check with the same name
+
+        Takes the same parameters as check_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+        check_type isn't returned by the API, so it is only set when the Check is created.
+
+        :return: ID of the Check
+        """
+        return self._upsert(ObjectType.CHECK, self.check_create, name, **kwargs)
+
+    def check_update(self, check_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a check.
 
         :param check_id: ID of the check
         :param changes: Dict of parameters to change. Key has to be Union[CheckParam, str], the value str
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, CheckParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"checks/{check_id}", data=changes)
+        return self._update(f"checks/{check_id}", changes)
 
     def check_delete(self, check_id: Union[str, int]) -> None:
         """This method is used to delete a check
@@ -162,8 +636,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "metrics", {"filter": [str(x) for x in metric_id]})
                 return [Metric(**x) for x in ret["data"]]
             elif isinstance(metric_id, str) or isinstance(metric_id, int):
-                ret = self._make_request(Method.GET, f"metrics/{str(metric_id)}")
-                return Metric(**ret["data"])
+                return Metric(**self._get_one(ObjectType.METRIC, metric_id))
             else:
                 raise ValueError
         else:
@@ -210,14 +683,26 @@ class QApi:
         ret = self._make_request(Method.POST, "metrics", data=params)
         return ret["data"]
 
-    def metric_update(self, metric_id: Union[str, int], changes: dict) -> None:
+    def metric_upsert(self, name: str, linked_host_id: Union[str, int], **kwargs) -> int:
+        """This method is used to create a Metric or update the existing Metric with the same name
+
+        Takes the same parameters as metric_create. Metrics are matched by name and linked host. Existing objects are
+        looked up in a name index that is loaded with a single listing on first use. Only differing fields are updated,
+        unchanged objects are skipped.
+
+        :return: ID of the Metric
+        """
+        return self._upsert(ObjectType.METRIC, self.metric_create, name, linked_host_id=linked_host_id, **kwargs)
+
+    def metric_update(self, metric_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a metric
 
         :param metric_id: ID of the metric
         :param changes: Dictionary with MetricParam as key and its value as str
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, CheckParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"metrics/{metric_id}", data=changes)
+        return self._update(f"metrics/{metric_id}", changes)
 
     def metric_delete(self, metric_id: Union[str, int]):
         """This method is used to delete a metric
@@ -239,8 +724,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "timeperiods", {"filter": [str(x) for x in time_period_id]})
                 return [TimePeriod(**x) for x in ret["data"]]
             elif isinstance(time_period_id, str) or isinstance(time_period_id, int):
-                ret = self._make_request(Method.GET, f"timeperiods/{time_period_id}")
-                return TimePeriod(**ret["data"])
+                return TimePeriod(**self._get_one(ObjectType.TIME_PERIOD, time_period_id))
             else:
                 raise ValueError
         else:
@@ -262,14 +746,25 @@ class QApi:
         ret = self._make_request(Method.POST, "timeperiods", data=params)
         return ret["data"]
 
-    def time_period_update(self, time_period_id: Union[str, int], changes: dict) -> None:
+    def time_period_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a TimePeriod or update the existing TimePeriod with the same name
+
+        Takes the same parameters as time_period_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the TimePeriod
+        """
+        return self._upsert(ObjectType.TIME_PERIOD, self.time_period_create, name, **kwargs)
+
+    def time_period_update(self, time_period_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a TimePeriod
 
         :param time_period_id: ID of the TimePeriod
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, TimePeriodParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"timeperiods/{time_period_id}", data=changes)
+        return self._update(f"timeperiods/{time_period_id}", changes)
 
     def time_period_delete(self, time_period_id: Union[str, int]) -> None:
         """This method is used to delete a TimePeriod
@@ -290,22 +785,22 @@ class QApi:
                 ret = self._make_request(Method.GET, "globalvariables", {"filter": [str(x) for x in global_variable_id]})
                 return [GlobalVariable(**x) for x in ret["data"]]
             elif isinstance(global_variable_id, str) or isinstance(global_variable_id, int):
-                ret = self._make_request(Method.GET, f"globalvariables/{global_variable_id}")
-                return GlobalVariable(**ret["data"])
+                return GlobalVariable(**self._get_one(ObjectType.GLOBAL_VARIABLE, global_variable_id))
             else:
                 raise ValueError
         else:
             ret = self._make_request(Method.GET, "globalvariables")
         return [GlobalVariable(**x) for x in ret["data"]]
 
-    def global_variable_update(self, global_variable_id: Union[str, int], changes: dict) -> None:
+    def global_variable_update(self, global_variable_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a GlobalVariable
 
         :param global_variable_id: ID of a GlobalVariable
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, TimePeriodParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"globalvariables/{global_variable_id}", data=changes)
+        return self._update(f"globalvariables/{global_variable_id}", changes)
 
     def global_variable_delete(self, global_variable_id: Union[str, int]) -> None:
         """This method is used to delete a GlobalVariable
@@ -326,8 +821,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "metrictemplates", {"filter": [str(x) for x in metric_template_id]})
                 return [MetricTemplate(**x) for x in ret["data"]]
             elif isinstance(metric_template_id, str) or isinstance(metric_template_id, int):
-                ret = self._make_request(Method.GET, f"metrictemplates/{metric_template_id}")
-                return MetricTemplate(**ret["data"])
+                return MetricTemplate(**self._get_one(ObjectType.METRIC_TEMPLATE, metric_template_id))
             else:
                 raise ValueError
         else:
@@ -368,14 +862,25 @@ class QApi:
         ret = self._make_request(Method.POST, "metrictemplates", data=params)
         return ret["data"]
 
-    def metric_template_update(self, metric_template_id: Union[str, int], changes: dict) -> None:
+    def metric_template_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a MetricTemplate or update the existing MetricTemplate with the same name
+
+        Takes the same parameters as metric_template_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the MetricTemplate
+        """
+        return self._upsert(ObjectType.METRIC_TEMPLATE, self.metric_template_create, name, **kwargs)
+
+    def metric_template_update(self, metric_template_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a MetricTemplate
 
         :param metric_template_id: ID of a MetricTemplate
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, MetricTemplateParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"metrictemplates/{metric_template_id}", data=changes)
+        return self._update(f"metrictemplates/{metric_template_id}", changes)
 
     def metric_template_delete(self, metric_template_id: Union[str, int]) -> None:
         """This method is used to delete a MetricTemplate
@@ -396,33 +901,46 @@ class QApi:
                 ret = self._make_request(Method.GET, "contactgroups", {"filter": [str(x) for x in contact_group_id]})
                 return [ContactGroup(**x) for x in ret["data"]]
             elif isinstance(contact_group_id, str) or isinstance(contact_group_id, int):
-                ret = self._make_request(Method.GET, f"contactgroups/{contact_group_id}")
-                return ContactGroup(**ret["data"])
+                return ContactGroup(**self._get_one(ObjectType.CONTACT_GROUP, contact_group_id))
             else:
                 raise ValueError
         else:
             ret = self._make_request(Method.GET, "contactgroups")
         return [ContactGroup(**x) for x in ret["data"]]
 
-    def contact_group_create(self, name: str, linked_contacts: Union[list, str, int] = None) -> None:
+    def contact_group_create(self, name: str, linked_contacts: Union[list, str, int] = None) -> int:
         """This method is used to create a ContactGroup
 
         :param name: Name of the ContactGroup
         :param linked_contacts: Optional. ID of Contact or list of them.
+
+        :return: ID of the created ContactGroup
         """
         params = {"name": name}
         if linked_contacts:
             params["linked_contacts"] = linked_contacts
-        self._make_request(Method.POST, "contactgroups", data=params)
+        ret = self._make_request(Method.POST, "contactgroups", data=params)
+        return ret["data"]
+
+    def contact_group_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a ContactGroup or update the existing ContactGroup with the same name
+
+        Takes the same parameters as contact_group_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the ContactGroup
+        """
+        return self._upsert(ObjectType.CONTACT_GROUP, self.contact_group_create, name, **kwargs)
 
-    def contact_group_update(self, contact_group_id: Union[str, int], changes: dict) -> None:
+    def contact_group_update(self, contact_group_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a ContactGroup
 
         :param contact_group_id: ID of a ContactGroup
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, ContactGroupParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"contactgroups/{contact_group_id}", data=changes)
+        return self._update(f"contactgroups/{contact_group_id}", changes)
 
     def contact_group_delete(self, contact_group_id: Union[str, int]) -> None:
         """This method is used to delete a ContactGroup
@@ -441,8 +959,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "contacts", {"filter": [str(x) for x in contact_id]})
                 return [Contact(**x) for x in ret["data"]]
             elif isinstance(contact_id, str) or isinstance(contact_id, int):
-                ret = self._make_request(Method.GET, f"contacts/{contact_id}")
-                return Contact(**ret["data"])
+                return Contact(**self._get_one(ObjectType.CONTACT, contact_id))
             else:
                 raise ValueError
         else:
@@ -481,14 +998,25 @@ class QApi:
         ret = self._make_request(Method.POST, "contacts", data=params)
         return ret["data"]
 
-    def contact_update(self, contact_id: Union[str, int], changes: dict) -> None:
+    def contact_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a Contact or update the existing Contact with the same name
+
+        Takes the same parameters as contact_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the Contact
+        """
+        return self._upsert(ObjectType.CONTACT, self.contact_create, name, **kwargs)
+
+    def contact_update(self, contact_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a Contact
 
         :param contact_id: ID of a Contact
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, ContactParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"contacts/{contact_id}", data=changes)
+        return self._update(f"contacts/{contact_id}", changes)
 
     def contact_delete(self, contact_id: Union[str, int]) -> None:
         """This method is used to delete a Contact
@@ -507,8 +1035,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "hosttemplates", {"filter": [str(x) for x in host_template_id]})
                 return [HostTemplate(**x) for x in ret["data"]]
             elif isinstance(host_template_id, str) or isinstance(host_template_id, int):
-                ret = self._make_request(Method.GET, f"hosttemplates/{host_template_id}")
-                return HostTemplate(**ret["data"])
+                return HostTemplate(**self._get_one(ObjectType.HOST_TEMPLATE, host_template_id))
             else:
                 raise ValueError
         else:
@@ -550,14 +1077,25 @@ class QApi:
         ret = self._make_request(Method.POST, "hosttemplates", data=params)
         return ret["data"]
 
-    def host_template_update(self, host_template_id: Union[str, int], changes: dict) -> None:
+    def host_template_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a HostTemplate or update the existing HostTemplate with the same name
+
+        Takes the same parameters as host_template_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the HostTemplate
+        """
+        return self._upsert(ObjectType.HOST_TEMPLATE, self.host_template_create, name, **kwargs)
+
+    def host_template_update(self, host_template_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a Contact
 
         :param host_template_id: ID of a HostTemplate
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, HostTemplateParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"hosttemplates/{host_template_id}", data=changes)
+        return self._update(f"hosttemplates/{host_template_id}", changes)
 
     def host_template_delete(self, host_template_id: Union[str, int]) -> None:
         """This method is used to delete a HostTemplate
@@ -576,8 +1114,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "hosts", {"filter": [str(x) for x in host_id]})
                 return [Host(**x) for x in ret["data"]]
             elif isinstance(host_id, str) or isinstance(host_id, int):
-                ret = self._make_request(Method.GET, f"hosts/{host_id}")
-                return Host(**ret["data"])
+                return Host(**self._get_one(ObjectType.HOST, host_id))
             else:
                 raise ValueError
         else:
@@ -621,14 +1158,25 @@ class QApi:
         ret = self._make_request(Method.POST, "hosts", data=params)
         return ret["data"]
 
-    def host_update(self, host_id: Union[str, int], changes: dict) -> None:
+    def host_upsert(self, name: str, linked_proxy_id: Union[str, int], **kwargs) -> int:
+        """This method is used to create a Host or update the existing Host with the same name
+
+        Takes the same parameters as host_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the Host
+        """
+        return self._upsert(ObjectType.HOST, self.host_create, name, linked_proxy_id=linked_proxy_id, **kwargs)
+
+    def host_update(self, host_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a Host
 
         :param host_id: ID of a Host
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, HostParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"hosts/{host_id}", data=changes)
+        return self._update(f"hosts/{host_id}", changes)
 
     def host_delete(self, host_id: Union[str, int]) -> None:
         """This method is used to delete a Host
@@ -647,8 +1195,7 @@ class QApi:
                 ret = self._make_request(Method.GET, "proxies", {"filter": [str(x) for x in proxy_id]})
                 return [Proxy(**x) for x in ret["data"]]
             elif isinstance(proxy_id, str) or isinstance(proxy_id, int):
-                ret = self._make_request(Method.GET, f"proxies/{proxy_id}")
-                return Proxy(**ret["data"])
+                return Proxy(**self._get_one(ObjectType.PROXY, proxy_id))
             else:
                 raise ValueError
         else:
@@ -682,14 +1229,25 @@ class QApi:
         ret = self._make_request(Method.POST, "proxies", data=params)
         return ret["data"]
 
-    def proxy_update(self, proxy_id: Union[str, int], changes: dict) -> None:
+    def proxy_upsert(self, name: str, **kwargs) -> int:
+        """This method is used to create a Proxy or update the existing Proxy with the same name
+
+        Takes the same parameters as proxy_create. Existing objects are looked up in a name index that is
+        loaded with a single listing on first use. Only differing fields are updated, unchanged objects are skipped.
+
+        :return: ID of the Proxy
+        """
+        return self._upsert(ObjectType.PROXY, self.proxy_create, name, **kwargs)
+
+    def proxy_update(self, proxy_id: Union[str, int], changes: dict) -> Optional[Future]:
         """This method is used to update a Proxy
 
         :param proxy_id: ID of a Proxy
         :param changes: Changes to submit. The keys define the parameter to update and the value sets its value.
+        :return: Future of the change if the write-behind queue is enabled, else None
         """
         changes = {x.value if isinstance(x, ProxyParam) else x: changes[x] for x in changes}
-        self._make_request(Method.PUT, f"proxies/{proxy_id}", data=changes)
+        return self._update(f"proxies/{proxy_id}", changes)
 
     def proxy_delete(self, proxy_id: Union[str, int]) -> None:
         """This method is used to delete a Proxy
@@ -0,0 +1,114 @@
+import threading
+from typing import Iterable, Optional
+
+
+def normalize_value(value):
+    """Normalizes the value of a reference field for comparison
+
+    IDs may be returned as int, str or as nested object, so all of them are compared by their string representation.
+    Don't use it for other fields, it would e.g. treat the variables {"a": 1} and {"a": "1"} as equal.
+    """
+    if isinstance(value, dict) and "id" in value:
+        return str(value["id"])
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(x) for x in value]
+    if isinstance(value, dict):
+        return {k: normalize_value(v) for k, v in value.items()}
+    return value
+
+
+def values_equal(current, value, reference: bool = False) -> bool:
+    """Compares the stored value of a field with a value to write
+
+    References are compared by the IDs they point to. Other values are compared strictly, except that top level
+    int and str are compared by their string representation, because parameters like scheduling_interval take both.
+
+    :param current: Value of the stored object
+    :param value: Value to write
+    :param reference: Optional. True if the field references other objects
+    """
+    if reference:
+        return normalize_value(current) == normalize_value(value)
+    scalars = (int, str)
+    if isinstance(current, scalars) and isinstance(value, scalars) and not isinstance(current, bool) \
+            and not isinstance(value, bool):
+        return str(current) == str(value)
+    return current == value
+
+
+def index_key(endpoint: str, record: dict):
+    """Returns the key of an object in the index
+
+    Names of metrics are only unique per host, so they are keyed by the ID of the host and their name.
+    """
+    if endpoint == "metrics":
+        return normalize_value(record.get("linked_host")), record.get("name")
+    return record.get("name")
+
+
+class NameIndex:
+    """Client side index of objects by name, kept in sync with the writes of the QApi it belongs to
+
+    The index of a type is loaded with a single listing on first use. Afterwards, successful creates, updates
+    and deletes of that type are applied to the index, so it doesn't have to be loaded again.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_id = {}
+
+    def loaded(self, endpoint: str) -> bool:
+        return endpoint in self._by_key
+
+    def load(self, endpoint: str, records: Iterable[dict]) -> None:
+        by_key = {}
+        by_id = {}
+        for record in records:
+            by_key[index_key(endpoint, record)] = record
+            by_id[str(record["id"])] = record
+        with self._lock:
+            self._by_key[endpoint] = by_key
+            self._by_id[endpoint] = by_id
+
+    def invalidate(self, endpoint: str = None) -> None:
+        """Drops the index of a type, or of all types if endpoint is None"""
+        with self._lock:
+            if endpoint is None:
+                self._by_key.clear()
+                self._by_id.clear()
+            else:
+                self._by_key.pop(endpoint, None)
+                self._by_id.pop(endpoint, None)
+
+    def get(self, endpoint: str, key) -> Optional[dict]:
+        with self._lock:
+            return self._by_key[endpoint].get(key)
+
+    def observe(self, method: str, endpoint: str, data: Optional[dict], result) -> None:
+        """Applies a successful request to the index
+
+        :param method: HTTP method of the request
+        :param endpoint: Endpoint of the request, e.g. hosts or hosts/1
+        :param data: Data sent with the request
+        :param result: Value of data in the answer of the server
+        """
+        endpoint, _, object_id = endpoint.strip("/").partition("/")
+        with self._lock:
+            if endpoint not in self._by_key:
+                return
+            by_key = self._by_key[endpoint]
+            by_id = self._by_id[endpoint]
+            if method == "post" and not object_id and data and result is not None:
+                record = dict(data, id=result)
+                by_key[index_key(endpoint, record)] = record
+                by_id[str(result)] = record
+            elif method == "put" and object_id in by_id and data:
+                record = by_id[object_id]
+                by_key.pop(index_key(endpoint, record), None)
+                record.update(data)
+                by_key[index_key(endpoint, record)] = record
+            elif method == "delete" and object_id in by_id:
+                record = by_id.pop(object_id)
+                by_key.pop(index_key(endpoint, record), None)
@@ -1 +1,42 @@
-from main import QApi
+"""Classes representing the objects of Q and the enums of their parameters
+
+The modules are imported on first access of their names.
+"""
+
+_EXPORTS = {
+    "Base": ".base",
+    "Check": ".check",
+    "CheckParam": ".check",
+    "Contact": ".contact",
+    "ContactParam": ".contact",
+    "ContactGroup": ".contact_group",
+    "ContactGroupParam": ".contact_group",
+    "GlobalVariable": ".global_variable",
+    "GlobalVariableParam": ".global_variable",
+    "Host": ".host",
+    "HostParam": ".host",
+    "HostTemplate": ".host_template",
+    "HostTemplateParam": ".host_template",
+    "Metric": ".metric",
+    "MetricTemplate": ".metric_template",
+    "MetricTemplateParam": ".metric_template",
+    "Proxy": ".proxy",
+    "ProxyParam": ".proxy",
+    "TimePeriod": ".time_period",
+    "TimePeriodParam": ".time_period",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
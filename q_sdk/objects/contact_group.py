@@ -1,13 +1,15 @@
 import enum
 
-from objects.base import Base
+from .base import Base
 
 
 class ContactGroup(Base):
-    def __init__(self, name, linked_contacts=None):
+    def __init__(self, name, linked_contacts=None, id=None, comment=None):
         super(ContactGroup, self).__init__()
+        self.id = id
         self.name = name
         self.linked_contacts = linked_contacts
+        self.comment = comment
 
 
 class ContactGroupParam(enum.Enum):
@@ -1,6 +1,6 @@
 import enum
 
-from objects.base import Base
+from .base import Base
 
 
 class HostTemplate(Base):
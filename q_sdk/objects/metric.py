@@ -1,4 +1,4 @@
-from objects.base import Base
+from .base import Base
 
 
 class Metric(Base):
@@ -0,0 +1,58 @@
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Union
+
+from .main import QApi
+from .session import dump_cookies, load_cookies
+
+_worker_api = None
+"""QApi of the current worker process"""
+
+
+def _init_worker(api_kwargs: dict, cookies: list[dict]) -> None:
+    global _worker_api
+    _worker_api = QApi(**api_kwargs)
+    load_cookies(_worker_api.client.cookies.jar, cookies)
+
+
+def _call(method: str, item: Union[dict, tuple, list]):
+    func = getattr(_worker_api, method)
+    if isinstance(item, dict):
+        return func(**item)
+    if isinstance(item, (tuple, list)):
+        return func(*item)
+    return func(item)
+
+
+def process_map(
+        api: QApi, method: str, items: Iterable[Union[dict, tuple, list]], max_workers: int = None,
+        chunksize: int = 16
+) -> Iterator:
+    """Calls a method of QApi for every item in a pool of worker processes
+
+    Use it for bulk operations where encoding the payloads and building the objects is the bottleneck.
+    Every worker process creates its own QApi with the settings of api and reuses its authenticated session.
+    Exceptions raised by a call are raised when its result is reached.
+
+    :param api: QApi whose settings and session are used by the workers
+    :param method: Name of the method to call, e.g. host_create
+    :param items: Arguments of the calls. A dict is passed as keyword arguments, a tuple or list as positional
+    arguments and anything else as single argument.
+    :param max_workers: Optional. Number of worker processes. Defaults to the number of CPUs.
+    :param chunksize: Optional. Number of items sent to a worker at once. Defaults to 16
+
+    :return: Iterator over the results, in the order of items
+    """
+    if not callable(getattr(api, method, None)):
+        raise ValueError(f"QApi has no method {method}")
+    # The session is passed as cookies, the store itself may not be picklable
+    api_kwargs = {k: v for k, v in api.settings.items() if k != "session_store"}
+    return _map(api_kwargs, dump_cookies(api.client.cookies.jar), method, items, max_workers, chunksize)
+
+
+def _map(api_kwargs: dict, cookies: list[dict], method: str, items: Iterable, max_workers: int, chunksize: int):
+    with ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), initializer=_init_worker, initargs=(api_kwargs, cookies)
+    ) as executor:
+        yield from executor.map(functools.partial(_call, method), items, chunksize=chunksize)
@@ -0,0 +1,271 @@
+import re
+import threading
+from typing import Iterable, Optional, Union
+
+from .bulk import ref_ids
+from .main import ObjectType, QApi
+
+DEFAULT_PATTERN = re.compile(r"\$([A-Za-z0-9_.-]+)\$")
+"""Matches variables in commandlines of checks, e.g. $HOST_ADDRESS$"""
+
+
+def _by_id(objects: Iterable[dict]) -> dict[str, dict]:
+    return {str(x["id"]): x for x in objects}
+
+
+class VariableRenderer:
+    """Local engine to render the commandlines of checks with the variables that apply to a host or metric
+
+    Variables are resolved in the order global variables, host templates, host, metric templates, metric,
+    later scopes override earlier ones. Templates are applied in their listed order, inherited templates first.
+
+    The scopes of templates and hosts and the rendered commandlines are memoized. Changes are passed to update()
+    or remove(), which only drop the cached entries depending on the changed object.
+
+    :param global_variables: GlobalVariables
+    :param checks: Checks
+    :param host_templates: HostTemplates
+    :param hosts: Hosts
+    :param metric_templates: MetricTemplates
+    :param metrics: Metrics
+    :param pattern: Optional. Compiled regex matching variables. Its first group has to be the name of the variable.
+    """
+    def __init__(
+            self, global_variables: Iterable[dict] = (), checks: Iterable[dict] = (),
+            host_templates: Iterable[dict] = (), hosts: Iterable[dict] = (), metric_templates: Iterable[dict] = (),
+            metrics: Iterable[dict] = (), pattern: re.Pattern = DEFAULT_PATTERN
+    ):
+        self.pattern = pattern
+        self._objects = {
+            ObjectType.GLOBAL_VARIABLE: _by_id(global_variables),
+            ObjectType.CHECK: _by_id(checks),
+            ObjectType.HOST_TEMPLATE: _by_id(host_templates),
+            ObjectType.HOST: _by_id(hosts),
+            ObjectType.METRIC_TEMPLATE: _by_id(metric_templates),
+            ObjectType.METRIC: _by_id(metrics),
+        }
+        self._lock = threading.RLock()
+        self._globals = None
+        self._check_variables = {}
+        self._scopes = {ObjectType.HOST_TEMPLATE: {}, ObjectType.METRIC_TEMPLATE: {}, ObjectType.HOST: {}}
+        self._rendered = {}
+        self._host_metrics = {}
+        for metric_id, metric in self._objects[ObjectType.METRIC].items():
+            self._index_metric(metric_id, metric)
+
+    @classmethod
+    def from_api(cls, api: QApi, pattern: re.Pattern = DEFAULT_PATTERN) -> "VariableRenderer":
+        """Loads all objects needed to render the commandlines from the API"""
+        return cls(
+            global_variables=api.iter_global_variables(), checks=api.iter_checks(),
+            host_templates=api.iter_host_templates(), hosts=api.iter_hosts(),
+            metric_templates=api.iter_metric_templates(), metrics=api.iter_metrics(), pattern=pattern
+        )
+
+    def _index_metric(self, metric_id: str, metric: dict) -> None:
+        for host_id in ref_ids(metric.get("linked_host")):
+            self._host_metrics.setdefault(host_id, set()).add(metric_id)
+
+    def _global_table(self) -> dict:
+        if self._globals is None:
+            self._globals = {
+                x["key"]: x["value"] for x in self._objects[ObjectType.GLOBAL_VARIABLE].values() if x.get("key")
+            }
+        return self._globals
+
+    def _variables_of_check(self, check_id: str) -> set:
+        if check_id not in self._check_variables:
+            check = self._objects[ObjectType.CHECK].get(check_id)
+            cmd = (check.get("cmd") or "") if check else ""
+            self._check_variables[check_id] = set(self.pattern.findall(cmd))
+        return self._check_variables[check_id]
+
+    def _template_scope(self, object_type: ObjectType, template_id: str, visiting: frozenset = frozenset()) -> dict:
+        cache = self._scopes[object_type]
+        if template_id in cache:
+            return cache[template_id]
+        template = self._objects[object_type].get(template_id)
+        if template is None or template_id in visiting:
+            return {}
+        field = "host_templates" if object_type == ObjectType.HOST_TEMPLATE else "metric_templates"
+        scope = {}
+        for parent_id in ref_ids(template.get(field)):
+            scope.update(self._template_scope(object_type, parent_id, visiting | {template_id}))
+        scope.update(template.get("variables") or {})
+        cache[template_id] = scope
+        return scope
+
+    def _template_check(self, object_type: ObjectType, template_ids: list, visiting: frozenset = frozenset()):
+        field = "host_templates" if object_type == ObjectType.HOST_TEMPLATE else "metric_templates"
+        for template_id in template_ids:
+            template = self._objects[object_type].get(template_id)
+            if template is None or template_id in visiting:
+                continue
+            check = ref_ids(template.get("linked_check"))
+            if check:
+                return check[0]
+            check = self._template_check(object_type, ref_ids(template.get(field)), visiting | {template_id})
+            if check:
+                return check
+        return None
+
+    def host_scope(self, host_id: Union[str, int]) -> dict:
+        """Returns the variables of a host merged with the variables of its templates, without global variables"""
+        host_id = str(host_id)
+        with self._lock:
+            cache = self._scopes[ObjectType.HOST]
+            if host_id not in cache:
+                host = self._objects[ObjectType.HOST].get(host_id) or {}
+                scope = {}
+                for template_id in ref_ids(host.get("host_templates")):
+                    scope.update(self._template_scope(ObjectType.HOST_TEMPLATE, template_id))
+                scope.update(host.get("variables") or {})
+                cache[host_id] = scope
+            return cache[host_id]
+
+    def _render(self, check_id: Optional[str], *scopes: dict) -> Optional[str]:
+        if check_id is None or check_id not in self._objects[ObjectType.CHECK]:
+            return None
+        table = self._global_table()
+
+        def replace(match):
+            name = match.group(1)
+            for scope in reversed(scopes):
+                if name in scope:
+                    return str(scope[name])
+            return str(table[name]) if name in table else match.group(0)
+
+        return self.pattern.sub(replace, self._objects[ObjectType.CHECK][check_id].get("cmd") or "")
+
+    def render_host(self, host_id: Union[str, int]) -> Optional[str]:
+        """Returns the rendered commandline of the check of a host, or None if it has no check"""
+        host_id = str(host_id)
+        with self._lock:
+            key = (ObjectType.HOST, host_id)
+            if key not in self._rendered:
+                host = self._objects[ObjectType.HOST].get(host_id) or {}
+                check = ref_ids(host.get("linked_check"))
+                check_id = check[0] if check else self._template_check(
+                    ObjectType.HOST_TEMPLATE, ref_ids(host.get("host_templates"))
+                )
+                self._rendered[key] = (check_id, self._render(check_id, self.host_scope(host_id)))
+            return self._rendered[key][1]
+
+    def render_metric(self, metric_id: Union[str, int]) -> Optional[str]:
+        """Returns the rendered commandline of the check of a metric, or None if it has no check"""
+        metric_id = str(metric_id)
+        with self._lock:
+            key = (ObjectType.METRIC, metric_id)
+            if key not in self._rendered:
+                metric = self._objects[ObjectType.METRIC].get(metric_id) or {}
+                templates = ref_ids(metric.get("metric_templates"))
+                check = ref_ids(metric.get("linked_check"))
+                check_id = check[0] if check else self._template_check(ObjectType.METRIC_TEMPLATE, templates)
+                host = ref_ids(metric.get("linked_host"))
+                scopes = [self.host_scope(host[0])] if host else []
+                template_scope = {}
+                for template_id in templates:
+                    template_scope.update(self._template_scope(ObjectType.METRIC_TEMPLATE, template_id))
+                scopes += [template_scope, metric.get("variables") or {}]
+                self._rendered[key] = (check_id, self._render(check_id, *scopes))
+            return self._rendered[key][1]
+
+    def render_metrics(self, metric_ids: Iterable[Union[str, int]] = None) -> dict[str, Optional[str]]:
+        """Returns the rendered commandlines of metrics
+
+        :param metric_ids: Optional. IDs of the metrics to render. Defaults to all metrics.
+
+        :return: Dict of metric ID to rendered commandline
+        """
+        if metric_ids is None:
+            metric_ids = list(self._objects[ObjectType.METRIC])
+        return {str(x): self.render_metric(x) for x in metric_ids}
+
+    def _descendants(self, object_type: ObjectType, template_id: str) -> set:
+        """Returns the ID of the template and of all templates inheriting from it"""
+        field = "host_templates" if object_type == ObjectType.HOST_TEMPLATE else "metric_templates"
+        result = {template_id}
+        changed = True
+        while changed:
+            changed = False
+            for other_id, other in self._objects[object_type].items():
+                if other_id not in result and result.intersection(ref_ids(other.get(field))):
+                    result.add(other_id)
+                    changed = True
+        return result
+
+    def _drop_rendered(self, object_type: ObjectType, ids: Iterable[str]) -> None:
+        for x in ids:
+            self._rendered.pop((object_type, x), None)
+
+    def _invalidate(self, object_type: ObjectType, object_id: str, old: dict, new: dict) -> None:
+        if object_type == ObjectType.GLOBAL_VARIABLE:
+            self._globals = None
+            keys = {x.get("key") for x in (old, new) if x}
+            stale = [
+                key for key, (check_id, _) in self._rendered.items()
+                if check_id is not None and keys & self._variables_of_check(check_id)
+            ]
+            for key in stale:
+                del self._rendered[key]
+        elif object_type == ObjectType.CHECK:
+            self._check_variables.pop(object_id, None)
+            stale = [key for key, (check_id, _) in self._rendered.items() if check_id == object_id]
+            for key in stale:
+                del self._rendered[key]
+        elif object_type == ObjectType.HOST_TEMPLATE:
+            templates = self._descendants(object_type, object_id)
+            for template_id in templates:
+                self._scopes[object_type].pop(template_id, None)
+            hosts = [
+                host_id for host_id, host in self._objects[ObjectType.HOST].items()
+                if templates.intersection(ref_ids(host.get("host_templates")))
+            ]
+            for host_id in hosts:
+                self._invalidate_host(host_id)
+        elif object_type == ObjectType.HOST:
+            self._invalidate_host(object_id)
+        elif object_type == ObjectType.METRIC_TEMPLATE:
+            templates = self._descendants(object_type, object_id)
+            for template_id in templates:
+                self._scopes[object_type].pop(template_id, None)
+            self._drop_rendered(ObjectType.METRIC, [
+                metric_id for metric_id, metric in self._objects[ObjectType.METRIC].items()
+                if templates.intersection(ref_ids(metric.get("metric_templates")))
+            ])
+        elif object_type == ObjectType.METRIC:
+            for host_id in ref_ids(old.get("linked_host")) if old else []:
+                self._host_metrics.get(host_id, set()).discard(object_id)
+            if new:
+                self._index_metric(object_id, new)
+            self._drop_rendered(ObjectType.METRIC, [object_id])
+
+    def _invalidate_host(self, host_id: str) -> None:
+        self._scopes[ObjectType.HOST].pop(host_id, None)
+        self._drop_rendered(ObjectType.HOST, [host_id])
+        self._drop_rendered(ObjectType.METRIC, self._host_metrics.get(host_id, ()))
+
+    def update(self, object_type: ObjectType, obj: dict) -> None:
+        """Adds or replaces an object and drops the cached entries depending on it
+
+        :param object_type: Type of the object. One of GLOBAL_VARIABLE, CHECK, HOST_TEMPLATE, HOST, METRIC_TEMPLATE
+        or METRIC
+        :param obj: The new state of the object
+        """
+        object_id = str(obj["id"])
+        with self._lock:
+            old = self._objects[object_type].get(object_id)
+            self._objects[object_type][object_id] = obj
+            self._invalidate(object_type, object_id, old, obj)
+
+    def remove(self, object_type: ObjectType, object_id: Union[str, int]) -> None:
+        """Removes an object and drops the cached entries depending on it
+
+        :param object_type: Type of the object. See update().
+        :param object_id: ID of the object
+        """
+        object_id = str(object_id)
+        with self._lock:
+            old = self._objects[object_type].pop(object_id, None)
+            if old is not None:
+                self._invalidate(object_type, object_id, old, None)
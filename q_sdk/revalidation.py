@@ -0,0 +1,123 @@
+import collections
+import json
+import threading
+from typing import Optional
+
+from .objects.base import Base
+
+
+class RevalidationStats(Base):
+    """Counters of the conditional GETs of a QApi
+
+    :param requests: Number of GETs sent with validators
+    :param not_modified: Number of GETs answered with 304 Not Modified
+    :param bytes_saved: Size of the response bodies that didn't have to be transferred
+    :param without_validators: Number of answers that had neither ETag nor Last-Modified and weren't stored
+    """
+    def __init__(self, requests: int = 0, not_modified: int = 0, bytes_saved: int = 0, without_validators: int = 0):
+        super(RevalidationStats, self).__init__()
+        self.requests = requests
+        self.not_modified = not_modified
+        self.bytes_saved = bytes_saved
+        self.without_validators = without_validators
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of the GETs sent with validators that were answered with 304"""
+        return self.not_modified / self.requests if self.requests else 0.0
+
+
+def _copy(value):
+    # Decoded JSON only consists of dicts, lists and immutable values, so this is a cheaper copy.deepcopy
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(x) for x in value]
+    return value
+
+
+class _Entry:
+    __slots__ = ("etag", "last_modified", "decoded", "size")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], decoded: dict, size: int):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.decoded = decoded
+        self.size = size
+
+
+class ResponseCache:
+    """LRU cache of decoded GET answers and their validators
+
+    Answers with an ETag or Last-Modified header are stored. Repeated GETs send If-None-Match and
+    If-Modified-Since, and a 304 answer is served from the stored decoded answer without parsing it again.
+    Answers are copied when they are stored and served, so callers may modify the objects built from them.
+    Entries of a type are dropped on writes to that type, because Last-Modified only has a resolution of seconds.
+
+    :param max_entries: Optional. Maximum number of stored answers. Defaults to 256
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.stats = RevalidationStats()
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[dict]) -> tuple:
+        return endpoint.strip("/"), json.dumps(params, sort_keys=True) if params else ""
+
+    def headers(self, key: tuple) -> dict:
+        """Returns the conditional headers for a request"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            self._entries.move_to_end(key)
+            self.stats.requests += 1
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def not_modified(self, key: tuple) -> Optional[dict]:
+        """Returns the stored answer after a 304, or None if it was dropped in the meantime"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.stats.not_modified += 1
+            self.stats.bytes_saved += entry.size
+        return _copy(entry.decoded)
+
+    def store(self, key: tuple, headers, decoded: dict, size: int) -> None:
+        """Stores an answer if it has validators
+
+        :param key: Key of the request
+        :param headers: Headers of the answer
+        :param decoded: Decoded answer
+        :param size: Size of the answer body in bytes
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        entry = _Entry(etag, last_modified, _copy(decoded), size) if etag or last_modified else None
+        with self._lock:
+            if entry is None:
+                self.stats.without_validators += 1
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint: str = None) -> None:
+        """Drops the answers of the type of an endpoint, or all answers if endpoint is None"""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+            object_type = endpoint.strip("/").partition("/")[0]
+            for key in [x for x in self._entries if x[0].partition("/")[0] == object_type]:
+                del self._entries[key]
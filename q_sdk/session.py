@@ -0,0 +1,109 @@
+import abc
+import json
+import logging
+import os
+import tempfile
+import time
+from http.cookiejar import Cookie, CookieJar
+from typing import Optional
+
+logger = logging.getLogger("QApi")
+
+
+def dump_cookies(jar: CookieJar) -> list[dict]:
+    """Serializes the cookies of a jar to a list of dicts"""
+    return [
+        {
+            "name": x.name,
+            "value": x.value,
+            "domain": x.domain,
+            "path": x.path,
+            "secure": x.secure,
+            "expires": x.expires,
+        }
+        for x in jar
+    ]
+
+
+def load_cookies(jar: CookieJar, cookies: list[dict]) -> int:
+    """Adds serialized cookies to a jar, skipping expired ones
+
+    :return: Number of cookies added
+    """
+    now = time.time()
+    count = 0
+    for x in cookies:
+        if x.get("expires") is not None and x["expires"] <= now:
+            continue
+        domain = x.get("domain") or ""
+        jar.set_cookie(Cookie(
+            version=0, name=x["name"], value=x["value"], port=None, port_specified=False, domain=domain,
+            domain_specified=bool(domain), domain_initial_dot=domain.startswith("."), path=x.get("path") or "/",
+            path_specified=True, secure=bool(x.get("secure")), expires=x.get("expires"), discard=False,
+            comment=None, comment_url=None, rest={}
+        ))
+        count += 1
+    return count
+
+
+class SessionStore(abc.ABC):
+    """Base class of stores for the authenticated session of a QApi
+
+    Subclass it to share sessions with a different backend, e.g. a key value store used by all workers.
+    """
+    @abc.abstractmethod
+    def load(self, key: str) -> Optional[list[dict]]:
+        """Returns the stored cookies of the session with the given key, or None"""
+
+    @abc.abstractmethod
+    def save(self, key: str, cookies: list[dict]) -> None:
+        """Stores the cookies of the session with the given key"""
+
+    @abc.abstractmethod
+    def clear(self, key: str) -> None:
+        """Removes the session with the given key"""
+
+
+class FileSessionStore(SessionStore):
+    """Stores sessions in a JSON file that is only readable by the current user
+
+    :param path: Optional. Path of the file. Defaults to ~/.cache/q-sdk/sessions.json
+    """
+    def __init__(self, path: str = None):
+        self.path = path or os.path.join(os.path.expanduser("~"), ".cache", "q-sdk", "sessions.json")
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            logger.warning(f"Could not read session file {self.path}: {err}")
+            return {}
+
+    def _write(self, sessions: dict) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".sessions-")
+        try:
+            os.chmod(tmp, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(sessions, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, key: str) -> Optional[list[dict]]:
+        return self._read().get(key)
+
+    def save(self, key: str, cookies: list[dict]) -> None:
+        sessions = self._read()
+        sessions[key] = cookies
+        self._write(sessions)
+
+    def clear(self, key: str) -> None:
+        sessions = self._read()
+        if sessions.pop(key, None) is not None:
+            self._write(sessions)
@@ -0,0 +1,100 @@
+import json
+from typing import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Text buffer that is refilled from an iterator of chunks on demand
+
+    Consumed text is dropped when more data is read, so the buffer only holds the element that is parsed at the moment.
+    """
+    def __init__(self, chunks: Iterable[str]):
+        self.chunks = iter(chunks)
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        for chunk in self.chunks:
+            if chunk:
+                self.text = self.text[self.pos:] + chunk
+                self.pos = 0
+                return True
+        self.exhausted = True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise json.JSONDecodeError("Unexpected end of data", self.text, self.pos)
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expected {char!r}", self.text, self.pos)
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A value at the end of the buffer may continue in the next chunk. A number may also end before a
+            # trailing ".", "e" or sign, e.g. "1." is decoded as 1 followed by ".", so it is only complete if a
+            # delimiter follows.
+            if not self.exhausted and (end == len(self.text) or (
+                    isinstance(obj, (int, float)) and not isinstance(obj, bool)
+                    and all(x in _NUMBER_CHARS for x in self.text[end:])
+            )) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_array(chunks: Iterable[str], key: str = "data") -> Iterator:
+    """Incrementally parse a JSON object and yield the elements of its array ``key`` one by one
+
+    Only the element currently decoded is kept in memory, so the memory usage does not depend on the length of the
+    array. Other keys of the object are parsed and discarded.
+
+    :param chunks: Iterable of decoded text chunks, for example ``httpx.Response.iter_text()``
+    :param key: Key of the array in the top level object
+
+    :return: Iterator over the elements of the array
+    """
+    buf = _Buffer(chunks)
+    buf.expect("{")
+    if buf.peek() == "}":
+        return
+    while True:
+        name = buf.value()
+        buf.expect(":")
+        if name == key and buf.peek() == "[":
+            buf.pos += 1
+            if buf.peek() == "]":
+                buf.pos += 1
+            else:
+                while True:
+                    yield buf.value()
+                    if buf.peek() == ",":
+                        buf.pos += 1
+                        continue
+                    buf.expect("]")
+                    break
+        else:
+            buf.value()
+        if buf.peek() == ",":
+            buf.pos += 1
+            continue
+        buf.expect("}")
+        return
@@ -0,0 +1,248 @@
+import inspect
+import re
+from typing import Callable, Iterable, Optional
+
+from .error import ValidationError
+from .objects.check import Check, CheckParam
+from .objects.contact import Contact, ContactParam
+from .objects.contact_group import ContactGroup, ContactGroupParam
+from .objects.global_variable import GlobalVariable, GlobalVariableParam
+from .objects.host import Host, HostParam
+from .objects.host_template import HostTemplate, HostTemplateParam
+from .objects.metric import Metric
+from .objects.metric_template import MetricTemplate, MetricTemplateParam
+from .objects.proxy import Proxy, ProxyParam
+from .objects.time_period import TimePeriod, TimePeriodParam
+
+SCHEMA_SOURCES = {
+    "checks": (Check, CheckParam),
+    "metrics": (Metric, None),
+    "timeperiods": (TimePeriod, TimePeriodParam),
+    "globalvariables": (GlobalVariable, GlobalVariableParam),
+    "metrictemplates": (MetricTemplate, MetricTemplateParam),
+    "contactgroups": (ContactGroup, ContactGroupParam),
+    "contacts": (Contact, ContactParam),
+    "hosttemplates": (HostTemplate, HostTemplateParam),
+    "hosts": (Host, HostParam),
+    "proxies": (Proxy, ProxyParam),
+}
+"""Object class and Param enum of each endpoint, the allowed fields are taken from both"""
+
+REQUIRED_FIELDS = {
+    "checks": {"name"},
+    "metrics": {"name", "linked_host"},
+    "timeperiods": {"name", "time_periods"},
+    "globalvariables": {"key"},
+    "metrictemplates": {"name"},
+    "contactgroups": {"name"},
+    "contacts": {"name"},
+    "hosttemplates": {"name"},
+    "hosts": {"name", "linked_proxy"},
+    "proxies": {"name", "address", "port", "web_address", "web_port"},
+}
+"""Fields that have to be set on creation"""
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_TIME = re.compile(r"^([01][0-9]|2[0-3])[0-5][0-9]$|^2400$")
+
+
+def _is_id(value) -> bool:
+    if isinstance(value, dict):
+        value = value.get("id")
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or isinstance(value, str) and value != ""
+
+
+def _check_str(value) -> Optional[str]:
+    if not isinstance(value, str):
+        return "has to be a string"
+
+
+def _check_bool(value) -> Optional[str]:
+    if not isinstance(value, bool):
+        return "has to be a bool"
+
+
+def _check_seconds(value) -> Optional[str]:
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return "has to be a non-negative number of seconds"
+
+
+def _check_port(value) -> Optional[str]:
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 < value < 65536:
+        return "has to be a port between 1 and 65535"
+
+
+def _check_id(value) -> Optional[str]:
+    if not _is_id(value):
+        return "has to be an ID"
+
+
+def _check_ids(value) -> Optional[str]:
+    values = value if isinstance(value, list) else [value]
+    if not all(_is_id(x) for x in values):
+        return "has to be an ID or a list of IDs"
+
+
+def _check_variables(value) -> Optional[str]:
+    if not isinstance(value, dict) or not all(isinstance(x, str) for x in value):
+        return "has to be a dict with string keys"
+
+
+def _check_time_periods(value) -> Optional[str]:
+    if not isinstance(value, dict):
+        return "has to be a dict of weekdays, see TimePeriodParam.TIME_PERIODS"
+    missing = [x for x in WEEKDAYS if x not in value]
+    if missing:
+        return f"is missing {', '.join(missing)}"
+    unknown = [x for x in value if x not in WEEKDAYS]
+    if unknown:
+        return f"has unknown days {', '.join(map(str, unknown))}"
+    for day in WEEKDAYS:
+        if not isinstance(value[day], list):
+            return f"{day} has to be a list"
+        for period in value[day]:
+            if not isinstance(period, dict) or period.keys() != {"start_time", "stop_time"}:
+                return f"{day} has to contain dicts with start_time and stop_time"
+            start, stop = period["start_time"], period["stop_time"]
+            if not all(isinstance(x, str) and _TIME.match(x) for x in (start, stop)):
+                return f"{day} has a time not in the form HHMM"
+            if start >= stop:
+                return f"{day} has a period ending before it starts"
+
+
+FIELD_CHECKERS = {
+    "name": _check_str,
+    "cmd": _check_str,
+    "check_type": _check_str,
+    "comment": _check_str,
+    "address": _check_str,
+    "mail": _check_str,
+    "web_address": _check_str,
+    "key": _check_str,
+    "value": _check_str,
+    "disabled": _check_bool,
+    "scheduling_interval": _check_seconds,
+    "port": _check_port,
+    "web_port": _check_port,
+    "variables": _check_variables,
+    "time_periods": _check_time_periods,
+    "linked_proxy": _check_id,
+    "linked_check": _check_id,
+    "linked_host": _check_id,
+    "scheduling_period": _check_id,
+    "notification_period": _check_id,
+    "linked_host_notification_period": _check_id,
+    "linked_metric_notification_period": _check_id,
+    "host_templates": _check_ids,
+    "metric_templates": _check_ids,
+    "linked_contacts": _check_ids,
+    "linked_contact_groups": _check_ids,
+    "linked_host_notifications": _check_ids,
+    "linked_metric_notifications": _check_ids,
+}
+"""Checks of the values of fields. A check returns an error message or None."""
+
+
+class Validator:
+    """Precompiled validator of the create and update payloads of an endpoint
+
+    :param endpoint: Endpoint of the type, e.g. hosts
+    """
+    def __init__(self, endpoint: str):
+        cls, param = SCHEMA_SOURCES[endpoint]
+        fields = {x for x in inspect.signature(cls.__init__).parameters if x not in ("self", "id")}
+        if param is not None:
+            fields.update(x.value for x in param)
+        self.endpoint = endpoint
+        self.required = REQUIRED_FIELDS[endpoint]
+        self.checkers: dict[str, Callable] = {x: FIELD_CHECKERS.get(x, lambda value: None) for x in fields}
+
+    def errors(self, payload: dict, partial: bool = False) -> list[str]:
+        """Returns the problems of a payload
+
+        :param payload: Payload of a create, or of an update if partial is True
+        :param partial: Optional. If True, required fields may be missing.
+        """
+        if not isinstance(payload, dict):
+            return [f"{self.endpoint}: payload has to be a dict"]
+        errors = []
+        if not partial:
+            errors += [f"{self.endpoint}: {x} is required" for x in sorted(self.required - payload.keys())]
+        for field, value in payload.items():
+            checker = self.checkers.get(field)
+            if checker is None:
+                errors.append(f"{self.endpoint}: unknown field {field}")
+                continue
+            # Empty values unset optional fields
+            if value is None or (value == "" and field not in self.required):
+                continue
+            error = checker(value)
+            if error:
+                errors.append(f"{self.endpoint}: {field} {error}")
+        return errors
+
+    def validate(self, payload: dict, partial: bool = False) -> None:
+        """Raises a ValidationError if the payload has problems. See errors()."""
+        errors = self.errors(payload, partial)
+        if errors:
+            raise ValidationError(errors)
+
+
+_validators = {}
+
+
+def get_validator(endpoint: str) -> Validator:
+    """Returns the precompiled Validator of an endpoint"""
+    if endpoint not in _validators:
+        _validators[endpoint] = Validator(endpoint)
+    return _validators[endpoint]
+
+
+def validate_request(method: str, endpoint: str, data: Optional[dict]) -> None:
+    """Validates the payload of a create (POST to <type>) or update (PUT to <type>/<id>) request
+
+    Requests to other endpoints are not validated.
+
+    :raises ValidationError: If the payload has problems
+    """
+    endpoint, _, object_id = endpoint.strip("/").partition("/")
+    if endpoint not in SCHEMA_SOURCES or data is None:
+        return
+    if method == "post" and not object_id:
+        get_validator(endpoint).validate(data)
+    elif method == "put" and object_id:
+        get_validator(endpoint).validate(data, partial=True)
+
+
+def create_kwargs_to_payload(kwargs: dict) -> dict:
+    """Converts arguments of a *_create method of QApi to the payload it sends, skipping unset values"""
+    return {
+        (x[:-3] if x.endswith("_id") else x): kwargs[x] for x in kwargs if kwargs[x] is not None and kwargs[x] != ""
+    }
+
+
+def partition_valid(endpoint: str, payloads: Iterable[dict], partial: bool = False) -> tuple[list, list]:
+    """Splits payloads into valid and invalid ones, to reject bad items of bulk operations before any request
+
+    :param endpoint: Endpoint of the type, e.g. hosts
+    :param payloads: Payloads to check
+    :param partial: Optional. True for update payloads
+
+    :return: List of valid payloads and list of tuples of invalid payloads and their problems
+    """
+    validator = get_validator(endpoint)
+    valid = []
+    invalid = []
+    for payload in payloads:
+        errors = validator.errors(payload, partial)
+        if errors:
+            invalid.append((payload, errors))
+        else:
+            valid.append(payload)
+    return valid, invalid
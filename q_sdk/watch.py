@@ -0,0 +1,151 @@
+import enum
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Iterable, Iterator, Union
+
+from .bulk import fetch_objects
+from .main import OBJECT_CLASSES, ObjectType, QApi
+from .objects.base import Base
+
+logger = logging.getLogger("QApi")
+
+FETCH_CHUNK_SIZE = 100
+"""Maximum number of IDs requested at once when fetching changed objects"""
+
+
+class ChangeType(enum.Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class ChangeEvent(Base):
+    """Represents a change of an object
+
+    :param change: ChangeType of the event
+    :param object_type: ObjectType of the changed object
+    :param id: ID of the changed object
+    :param object: The new state of the object. None for deleted objects.
+    """
+    def __init__(self, change: ChangeType, object_type: ObjectType, id: str, object: Base = None):
+        super(ChangeEvent, self).__init__()
+        self.change = change
+        self.object_type = object_type
+        self.id = id
+        self.object = object
+
+
+def content_hash(record: dict) -> bytes:
+    """Returns a hash of the content of an object"""
+    return hashlib.blake2b(
+        json.dumps(record, sort_keys=True, separators=(",", ":")).encode(), digest_size=16
+    ).digest()
+
+
+class Watcher:
+    """Polls the API and detects created, updated and deleted objects
+
+    Only a content hash is kept per object. If fields are given, listings only contain these fields and only the
+    objects whose projected hash changed are fetched completely.
+
+    :param api: QApi to poll
+    :param object_types: Optional. Types to watch. Defaults to all types.
+    :param interval: Optional. Seconds between two polls. Defaults to 60
+    :param fields: Optional. Fields used for change detection, either a list for all types or a dict of ObjectType
+    to list. If None, complete objects are listed.
+    :param initial: Optional. If True, the first poll emits a created event for every existing object.
+    """
+    def __init__(
+            self, api: QApi, object_types: Iterable[ObjectType] = None, interval: float = 60,
+            fields: Union[list[str], dict[ObjectType, list[str]]] = None, initial: bool = False
+    ):
+        self.api = api
+        self.object_types = list(object_types or ObjectType)
+        self.interval = interval
+        self.fields = fields
+        self.initial = initial
+        self._hashes = {}
+        self._stopped = threading.Event()
+
+    def _fields(self, object_type: ObjectType):
+        fields = self.fields.get(object_type) if isinstance(self.fields, dict) else self.fields
+        if fields and "id" not in fields:
+            fields = ["id", *fields]
+        return fields
+
+    def _fetch(self, object_type: ObjectType, ids: list[str]) -> dict[str, dict]:
+        return {str(x["id"]): x for x in fetch_objects(self.api, object_type, ids, FETCH_CHUNK_SIZE)}
+
+    def _poll_type(self, object_type: ObjectType) -> list[ChangeEvent]:
+        emit = self.initial or object_type in self._hashes
+        # The hashes are only replaced after a complete poll, so a failed first poll doesn't mark the type as seen
+        hashes = self._hashes.get(object_type, {})
+        fields = self._fields(object_type)
+        listing = {}
+        changed = {}
+        for record in self.api._make_stream_request(object_type.value, data={"values": fields} if fields else None):
+            object_id = str(record["id"])
+            digest = content_hash(record)
+            listing[object_id] = digest
+            if hashes.get(object_id) != digest:
+                changed[object_id] = None if fields else record
+        if not emit:
+            self._hashes[object_type] = listing
+            return []
+
+        if fields and changed:
+            changed.update(self._fetch(object_type, list(changed)))
+        cls = OBJECT_CLASSES[object_type]
+        events = []
+        for object_id, record in changed.items():
+            if record is None:
+                # Deleted between the listing and the fetch
+                listing.pop(object_id)
+                continue
+            change = ChangeType.UPDATED if object_id in hashes else ChangeType.CREATED
+            events.append(ChangeEvent(change, object_type, object_id, cls(**record)))
+        for object_id in hashes.keys() - listing.keys():
+            events.append(ChangeEvent(ChangeType.DELETED, object_type, object_id))
+        self._hashes[object_type] = listing
+        return events
+
+    def poll(self) -> list[ChangeEvent]:
+        """Polls all watched types once
+
+        :return: Changes since the last poll. The first poll only records the current state, unless initial is True.
+        """
+        events = []
+        for object_type in self.object_types:
+            events += self._poll_type(object_type)
+        return events
+
+    def stop(self) -> None:
+        """Stops the iteration after the current poll"""
+        self._stopped.set()
+
+    def __iter__(self) -> Iterator[ChangeEvent]:
+        while not self._stopped.is_set():
+            start = time.monotonic()
+            for object_type in self.object_types:
+                try:
+                    events = self._poll_type(object_type)
+                except Exception as err:
+                    logger.error(f"Polling {object_type.value} for changes failed: {err}")
+                    continue
+                yield from events
+            self._stopped.wait(max(0.0, self.interval - (time.monotonic() - start)))
+
+
+def watch(
+        api: QApi, object_types: Iterable[ObjectType] = None, interval: float = 60,
+        fields: Union[list[str], dict[ObjectType, list[str]]] = None, initial: bool = False
+) -> Watcher:
+    """Watch the API for changes
+
+    Iterate over the returned Watcher to get a ChangeEvent for every created, updated or deleted object.
+    See Watcher for the parameters.
+    """
+    return Watcher(api, object_types=object_types, interval=interval, fields=fields, initial=initial)
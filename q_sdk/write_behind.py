@@ -0,0 +1,81 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable
+
+logger = logging.getLogger("QApi")
+
+
+class WriteBehindQueue:
+    """Queue that collects updates and writes them delayed, merging the changes to the same object
+
+    Changes submitted for the same endpoint are merged into one dict, later keys override earlier ones.
+    The queue is flushed if max_pending objects have pending changes, max_delay seconds after the first change
+    was submitted or if flush() is called. Writes that bypass the queue have to call discard() and flush() first
+    to keep the order of the writes, see QApi._make_request.
+
+    :param send: Callable that executes the update. Gets the endpoint and the merged changes.
+    :param max_pending: Maximum number of objects with pending changes
+    :param max_delay: Maximum time in seconds a change is delayed
+    """
+    def __init__(self, send: Callable[[str, dict], None], max_pending: int = 100, max_delay: float = 1.0):
+        self.send = send
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def submit(self, endpoint: str, changes: dict) -> Future:
+        """Submit changes to an object
+
+        :param endpoint: Endpoint of the object, e.g. hosts/1
+        :param changes: Changes to submit
+
+        :return: Future that resolves when the merged changes are written
+        """
+        future = Future()
+        with self._lock:
+            merged, futures = self._pending.setdefault(endpoint, ({}, []))
+            merged.update(changes)
+            futures.append(future)
+            full = len(self._pending) >= self.max_pending
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.start()
+        if full:
+            self.flush()
+        return future
+
+    def discard(self, endpoint: str) -> int:
+        """Drop the pending changes of an object, e.g. because it is deleted. Their futures are cancelled.
+
+        :param endpoint: Endpoint of the object, e.g. hosts/1
+
+        :return: Number of cancelled futures
+        """
+        with self._lock:
+            _, futures = self._pending.pop(endpoint, (None, []))
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    def flush(self) -> None:
+        """Write all pending changes"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            for endpoint, (changes, futures) in pending.items():
+                try:
+                    self.send(endpoint, changes)
+                except Exception as err:
+                    logger.error(f"Delayed update of {endpoint} failed: {err}")
+                    for future in futures:
+                        future.set_exception(err)
+                else:
+                    for future in futures:
+                        future.set_result(None)
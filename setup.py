@@ -22,5 +22,10 @@ setuptools.setup(
         "Operating System :: OS Independent",
     ],
     python_requires='>=3.6',
-    install_requires=requirements
+    install_requires=requirements,
+    entry_points={
+        "console_scripts": [
+            "q-import=q_sdk.importer:main",
+        ],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,54 @@
+import importlib.util
+import unittest
+
+from q_sdk.columnar import ColumnFormat, to_columnar
+
+COLUMNS = {
+    "scheduling_interval": [60, None, "", 300],
+    "disabled": [True, None, False, True],
+    "weight": [1.5, None, 2.0, ""],
+    "name": ["a", "b", "", "c"],
+    "count": [1, 2, 3, 4],
+}
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+@unittest.skipUnless(_installed("numpy"), "numpy is not installed")
+class NumpyColumnsTest(unittest.TestCase):
+    def test_missing_numbers_are_nan(self):
+        import numpy as np
+        columns = to_columnar(COLUMNS, ColumnFormat.NUMPY)
+        self.assertEqual(columns["scheduling_interval"].dtype, np.float64)
+        self.assertEqual(columns["disabled"].dtype, np.float64)
+        self.assertEqual(columns["count"].dtype, np.int64)
+        self.assertEqual(columns["name"].dtype, object)
+        interval = columns["scheduling_interval"]
+        self.assertEqual(list(interval[~np.isnan(interval)]), [60, 300])
+        np.histogram(interval[~np.isnan(interval)])
+
+
+@unittest.skipUnless(_installed("pandas"), "pandas is not installed")
+class PandasColumnsTest(unittest.TestCase):
+    def test_missing_numbers_are_nullable(self):
+        frame = to_columnar(COLUMNS, ColumnFormat.PANDAS)
+        self.assertEqual(str(frame["scheduling_interval"].dtype), "Int64")
+        self.assertEqual(str(frame["disabled"].dtype), "boolean")
+        self.assertEqual(str(frame["weight"].dtype), "float64")
+        self.assertEqual(str(frame["count"].dtype), "int64")
+        self.assertEqual(frame["scheduling_interval"].dropna().tolist(), [60, 300])
+
+
+@unittest.skipUnless(_installed("pyarrow"), "pyarrow is not installed")
+class ArrowColumnsTest(unittest.TestCase):
+    def test_missing_numbers_are_null(self):
+        import pyarrow as pa
+        table = to_columnar(COLUMNS, ColumnFormat.PYARROW)
+        self.assertEqual(table.schema.field("scheduling_interval").type, pa.int64())
+        self.assertEqual(table.column("scheduling_interval").null_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
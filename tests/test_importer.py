@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from q_sdk.importer import Checkpoint, import_file
+from q_sdk.main import QApi
+
+ROWS = 250
+
+
+class FakeServer:
+    """Minimal hosts endpoint of Q. Raises interrupt on the POST with the number interrupt_at."""
+    def __init__(self):
+        self.hosts = {}
+        self.posts = 0
+        self.interrupt_at = None
+        self.status = 200
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/hosts") and request.method == "GET":
+            return httpx.Response(200, json={"success": True, "data": list(self.hosts.values())})
+        if request.url.path.endswith("/hosts") and request.method == "POST":
+            self.posts += 1
+            if self.posts == self.interrupt_at:
+                raise KeyboardInterrupt
+            if self.status != 200:
+                return httpx.Response(self.status, text="unavailable")
+            host_id = len(self.hosts) + 1
+            self.hosts[host_id] = dict(json.loads(request.content), id=host_id)
+            return httpx.Response(200, json={"success": True, "data": host_id})
+        if "/hosts/" in request.url.path and request.method == "PUT":
+            host = self.hosts[int(request.url.path.rsplit("/", 1)[1])]
+            host.update(json.loads(request.content))
+            return httpx.Response(200, json={"success": True, "data": None})
+        return httpx.Response(404, text="not found")
+
+
+class ImportFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hosts.ndjson")
+        with open(self.path, "w") as f:
+            for i in range(ROWS):
+                f.write(json.dumps({"name": f"host{i}", "linked_proxy_id": 1}) + "\n")
+        self.server = FakeServer()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_import(self, **kwargs):
+        # Every run uses a new QApi, like a restarted process
+        api = QApi(uri="http://q.test/api/")
+        api.client = httpx.Client(transport=httpx.MockTransport(self.server))
+        return import_file(api, self.path, default_type="host", max_workers=4, **kwargs)
+
+    def assert_imported_once(self):
+        names = [x["name"] for x in self.server.hosts.values()]
+        self.assertEqual(sorted(names), sorted(f"host{i}" for i in range(ROWS)))
+
+    def test_resume_after_interruption(self):
+        self.server.interrupt_at = 180
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_import()
+        with open(f"{self.path}.checkpoint") as f:
+            state = json.load(f)
+        self.assertGreaterEqual(state["position"] + len(state["done"]), 170)
+
+        result = self.run_import()
+        self.assertFalse(result.failed)
+        self.assertEqual(result.created + result.skipped, ROWS)
+        self.assert_imported_once()
+
+    def test_failed_requests_are_retried_on_resume(self):
+        self.server.status = 503
+        result = self.run_import()
+        self.assertEqual(len(result.failed), ROWS)
+        self.assertFalse(self.server.hosts)
+
+        # The retry run is interrupted, the pending retries must stay in the checkpoint
+        self.server.status = 200
+        self.server.posts = 0
+        self.server.interrupt_at = 120
+        with self.assertRaises(KeyboardInterrupt):
+            self.run_import(checkpoint_every=10)
+        checkpoint = Checkpoint(f"{self.path}.checkpoint")
+        self.assertEqual(len(checkpoint.retry), ROWS - len(self.server.hosts))
+
+        self.server.interrupt_at = None
+        result = self.run_import()
+        self.assertFalse(result.failed)
+        self.assert_imported_once()
+        self.assertFalse(Checkpoint(f"{self.path}.checkpoint").failed)
+
+    def test_invalid_rows_are_not_retried(self):
+        with open(self.path, "a") as f:
+            f.write(json.dumps({"name": 5, "linked_proxy_id": 1}) + "\n")
+        result = self.run_import()
+        self.assertEqual([x.line for x in result.failed], [ROWS + 1])
+        result = self.run_import()
+        self.assertEqual(result.skipped, ROWS + 1)
+        self.assert_imported_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import itertools
+import json
+import unittest
+
+from q_sdk.stream import iter_json_array
+
+DOCUMENTS = [
+    '{"data": []}',
+    '{"success": true, "data": [1.5, -2e-3, 10, 0.25E+2, -0]}',
+    '{"data": [{"id": 1, "name": "h\\u00e4st \\"1\\"", "variables": {"a": [1, 2]}}, null, true, false], "x": 1.5}',
+    '{"message": "ok", "data": ["a", "b\\\\", 12345678901234567890], "success": true}',
+    ' { "data" : [ 1 , { } , [ ] ] } ',
+    '{"other": [1, 2], "data": [3]}',
+]
+
+
+def _splits(text: str, parts: int):
+    for positions in itertools.combinations(range(1, len(text)), parts - 1):
+        bounds = (0,) + positions + (len(text),)
+        yield [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def assert_parses(self, document: str, chunks: list[str]):
+        self.assertEqual(list(iter_json_array(chunks)), json.loads(document)["data"], chunks)
+
+    def test_single_chunk(self):
+        for document in DOCUMENTS:
+            self.assert_parses(document, [document])
+
+    def test_every_split_into_two_chunks(self):
+        for document in DOCUMENTS:
+            for chunks in _splits(document, 2):
+                self.assert_parses(document, chunks)
+
+    def test_every_split_into_three_chunks(self):
+        for document in DOCUMENTS[:3]:
+            for chunks in _splits(document, 3):
+                self.assert_parses(document, chunks)
+
+    def test_single_characters_and_empty_chunks(self):
+        for document in DOCUMENTS:
+            self.assert_parses(document, [x for c in document for x in ("", c)])
+
+    def test_number_split_after_dot_or_exponent(self):
+        self.assertEqual(list(iter_json_array(['{"data":[1.', '5, 2]}'])), [1.5, 2])
+        self.assertEqual(list(iter_json_array(['{"data":[1e', '3]}'])), [1000.0])
+        self.assertEqual(list(iter_json_array(['{"data":[1e-', '3]}'])), [0.001])
+        self.assertEqual(list(iter_json_array(['{"data":[-', '1]}'])), [-1])
+
+    def test_missing_key(self):
+        self.assertEqual(list(iter_json_array(['{"success": false, "message": "x"}'])), [])
+
+    def test_truncated_document(self):
+        for document in DOCUMENTS:
+            for end in range(len(document.rstrip()) - 1):
+                with self.assertRaises(json.JSONDecodeError, msg=document[:end]):
+                    list(iter_json_array([document[:end]]))
+
+    def test_invalid_document(self):
+        for text in ('[1, 2]', '{"data": [1 2]}', '{"data": [1,]}', '{"data" [1]}'):
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                list(iter_json_array([text]))
+
+
+if __name__ == "__main__":
+    unittest.main()
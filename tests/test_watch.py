@@ -0,0 +1,65 @@
+import unittest
+
+import httpx
+
+from q_sdk.error import HttpStatusCodeException
+from q_sdk.main import ObjectType, QApi
+from q_sdk.watch import ChangeType, Watcher
+
+
+def _host(host_id: int, name: str) -> dict:
+    return {"id": host_id, "name": name, "linked_proxy": 1}
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.hosts = [_host(1, "a"), _host(2, "b")]
+        self.status = 200
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if self.status != 200:
+                return httpx.Response(self.status, text="unavailable")
+            data = self.hosts
+            if "filter" in request.url.params:
+                ids = request.url.params.get_list("filter")
+                data = [x for x in data if str(x["id"]) in ids]
+            return httpx.Response(200, json={"success": True, "data": data})
+
+        self.api = QApi(uri="http://q.test/api/")
+        self.api.client = httpx.Client(transport=httpx.MockTransport(handler))
+        self.watcher = Watcher(self.api, [ObjectType.HOST])
+
+    def changes(self):
+        return sorted((x.change.value, x.id) for x in self.watcher.poll())
+
+    def test_first_poll_records_state(self):
+        self.assertEqual(self.changes(), [])
+        self.hosts[0] = _host(1, "c")
+        self.hosts.pop(1)
+        self.hosts.append(_host(3, "d"))
+        self.assertEqual(self.changes(), [
+            (ChangeType.CREATED.value, "3"), (ChangeType.DELETED.value, "2"), (ChangeType.UPDATED.value, "1")
+        ])
+        self.assertEqual(self.changes(), [])
+
+    def test_failed_first_poll_does_not_report_existing_objects(self):
+        self.status = 503
+        with self.assertRaises(HttpStatusCodeException):
+            self.watcher.poll()
+        self.status = 200
+        self.assertEqual(self.changes(), [])
+        self.hosts.append(_host(3, "d"))
+        self.assertEqual(self.changes(), [(ChangeType.CREATED.value, "3")])
+
+    def test_failed_poll_keeps_state(self):
+        self.changes()
+        self.hosts.append(_host(3, "d"))
+        self.status = 503
+        with self.assertRaises(HttpStatusCodeException):
+            self.watcher.poll()
+        self.status = 200
+        self.assertEqual(self.changes(), [(ChangeType.CREATED.value, "3")])
+
+
+if __name__ == "__main__":
+    unittest.main()